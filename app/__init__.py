@@ -1,6 +1,17 @@
+import os
+
 from flask import Flask
 from .config import Config
 from .extensions import db, migrate, jwt, socketio, cors
+from .utils.fanout import fanout_options
+from .utils.http_cache import response_cache
+from .utils import json_provider
+from .utils.identity import init_identity
+from .utils.instrumentation import init_instrumentation
+from .utils.message_buffer import message_buffer
+from .utils.message_writer import message_writer
+from .utils.pool_metrics import init_pool_metrics
+from .utils.presence import presence
 
 # blueprints
 from .routes.auth       import auth_bp
@@ -8,18 +19,32 @@ from .routes.users      import users_bp
 from .routes.chat       import chat_bp
 from .routes.events     import events_bp
 from .routes.businesses import businesses_bp
+from .routes.metrics    import metrics_bp
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = json_provider.FastJSONProvider(app)
 
     # init extensions
     cors.init_app(app)
+    init_pool_metrics(app)
     db.init_app(app)
-    migrate.init_app(app, db, compare_type=True)
+    migrate.init_app(app, db, compare_type=True,
+                     directory=os.path.join(os.path.dirname(__file__), "migrations"))
     jwt.init_app(app)
-    socketio.init_app(app, cors_allowed_origins="*")
+    init_identity(app)
+    response_cache.init_app(app)
+    socketio.init_app(app,
+                      async_mode=app.config["SOCKETIO_ASYNC_MODE"],
+                      cors_allowed_origins="*",
+                      json=json_provider,
+                      **fanout_options(app.config))
+    message_writer.init_app(app)
+    message_buffer.init_app(app)
+    presence.init_app(app)
+    init_instrumentation(app)
 
     # register routes
     app.register_blueprint(auth_bp,       url_prefix="/api/auth")
@@ -27,5 +52,6 @@ def create_app():
     app.register_blueprint(chat_bp,       url_prefix="/api/chat")
     app.register_blueprint(events_bp,     url_prefix="/api/events")
     app.register_blueprint(businesses_bp, url_prefix="/api/businesses")
+    app.register_blueprint(metrics_bp,    url_prefix="/api/metrics")
 
     return app
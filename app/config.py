@@ -13,10 +13,84 @@ class Config:
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # connection pool, per worker process. Thousands of idle sockets share
+    # it; size it for the number of green threads inside a DB call at once.
+    DB_POOL_SIZE    = int(os.getenv("DB_POOL_SIZE", 20))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))     # s to wait for a checkout
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))   # s before reconnecting
+    # pool metrics / alerts (see app/utils/pool_metrics.py)
+    DB_POOL_WAIT_WARN_MS   = int(os.getenv("DB_POOL_WAIT_WARN_MS", 100))
+    DB_POOL_ALERT_INTERVAL = int(os.getenv("DB_POOL_ALERT_INTERVAL", 10))   # s between warnings
+    SQLALCHEMY_ENGINE_OPTIONS = (
+        {"pool_pre_ping": True}
+        if DATABASE_URL.startswith("sqlite") else
+        {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": True,
+        }
+    )
+
+    # serving (see run.py)
+    SERVER_MODE         = os.getenv("SERVER_MODE", "development")      # development|production
+    SOCKETIO_ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE", "eventlet")  # eventlet|threading
+    SERVER_HOST    = os.getenv("HOST", "0.0.0.0")
+    SERVER_PORT    = int(os.getenv("PORT", 5000))
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 1))     # >1 needs SOCKETIO_MESSAGE_QUEUE
+    SERVER_MAX_CONNECTIONS = int(os.getenv("SERVER_MAX_CONNECTIONS", 10000))  # green threads per worker
+    SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", 2048))
+
     # JWT
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret-key")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
 
+    # cached user snapshots behind current_user (see app/utils/identity.py)
+    IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", 10000))
+    IDENTITY_CACHE_TTL  = int(os.getenv("IDENTITY_CACHE_TTL", 300))
+    IDENTITY_CACHE_SHARED_TTL = int(os.getenv("IDENTITY_CACHE_SHARED_TTL", 5))  # with SOCKETIO_MESSAGE_QUEUE
+
+    # tagged response cache for public GET endpoints (see app/utils/http_cache.py)
+    HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "True").lower() == "true"
+    HTTP_CACHE_SIZE    = int(os.getenv("HTTP_CACHE_SIZE", 2048))
+    HTTP_CACHE_TTL     = int(os.getenv("HTTP_CACHE_TTL", 60))       # server-side, seconds
+    HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 30))   # Cache-Control max-age
+
+    # batch endpoints (POST /api/events/bulk, /api/chat/rooms/join)
+    BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 500))
+
+    # password hashing (see app/utils/passwords.py); hashes made with another
+    # cost are upgraded on the next successful login
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+    BCRYPT_THREADS    = int(os.getenv("BCRYPT_THREADS", 4))
+
+    # Socket.IO fan-out between app processes (see app/utils/fanout.py)
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+
+    # chat write-behind (see app/utils/message_writer.py)
+    CHAT_WRITE_BEHIND     = os.getenv("CHAT_WRITE_BEHIND", "False").lower() == "true"
+    CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", 200))
+    CHAT_WRITE_FLUSH_MS   = int(os.getenv("CHAT_WRITE_FLUSH_MS", 20))
+
+    # newest-page history buffer (see app/utils/message_buffer.py)
+    MESSAGE_BUFFER_ENABLED = os.getenv("MESSAGE_BUFFER_ENABLED", "True").lower() == "true"
+    MESSAGE_BUFFER_SIZE    = int(os.getenv("MESSAGE_BUFFER_SIZE", 100))     # messages per room
+    MESSAGE_BUFFER_ROOMS   = int(os.getenv("MESSAGE_BUFFER_ROOMS", 1000))
+    MESSAGE_BUFFER_TTL     = int(os.getenv("MESSAGE_BUFFER_TTL", 300))      # seconds after warm-up
+    MESSAGE_BUFFER_SHARED_TTL = int(os.getenv("MESSAGE_BUFFER_SHARED_TTL", 2))  # with SOCKETIO_MESSAGE_QUEUE
+
+    # Socket.IO room presence (see app/utils/presence.py)
+    PRESENCE_DEBOUNCE_MS = int(os.getenv("PRESENCE_DEBOUNCE_MS", 250))
+
+    # SQL instrumentation (see app/utils/instrumentation.py); headers default to app.debug
+    SQL_INSTRUMENTATION      = os.getenv("SQL_INSTRUMENTATION", "True").lower() == "true"
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 5))   # same shape, one unit
+    SQL_SLOW_MS              = int(os.getenv("SQL_SLOW_MS", 500))
+    SQL_DEBUG_HEADERS        = (os.getenv("SQL_DEBUG_HEADERS").lower() == "true"
+                                if os.getenv("SQL_DEBUG_HEADERS") else None)   # None: follow app.debug
+
     # uploads
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
     UPLOAD_FOLDER = "app/static/uploads"
@@ -1,7 +1,7 @@
 from __future__ import with_statement
 import logging
 from logging.config import fileConfig
-from flask import current_app
+from flask import current_app, has_app_context
 from alembic import context
 import os
 import sys
@@ -17,8 +17,12 @@ from app import create_app
 from app.extensions import db
 from app.models import *
 
-app = create_app()
-app.app_context().push()
+if has_app_context():
+    # `flask db ...` and flask_migrate.upgrade() already run inside the app
+    app = current_app._get_current_object()
+else:
+    app = create_app()
+    app.app_context().push()
 config.set_main_option('sqlalchemy.url', app.config['SQLALCHEMY_DATABASE_URI'])
 
 target_metadata = db.metadata
@@ -0,0 +1,24 @@
+"""per-room message id index for delta sync
+
+Revision ID: 146785618414
+Revises: ba74b43854b0
+Create Date: 2026-10-18 19:47:03.338451
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '146785618414'
+down_revision = 'ba74b43854b0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_messages_room_id", "messages", ["chatroom_id", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_messages_room_id", table_name="messages")
@@ -0,0 +1,27 @@
+"""users.token_version
+
+Revision ID: 1d647fe8f422
+Revises: 47706ea7784b
+Create Date: 2026-10-18 19:30:12.664020
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1d647fe8f422'
+down_revision = '47706ea7784b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(sa.Column("token_version", sa.Integer(), nullable=False,
+                                      server_default="0"))
+
+
+def downgrade():
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("token_version")
@@ -0,0 +1,60 @@
+"""primary key and reverse index on chatroom_participants
+
+Revision ID: 47706ea7784b
+Revises: 79ed34463f62
+Create Date: 2026-10-18 19:21:47.530961
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '47706ea7784b'
+down_revision = '79ed34463f62'
+branch_labels = None
+depends_on = None
+
+participants = sa.table("chatroom_participants",
+                        sa.column("chatroom_id", sa.Integer), sa.column("user_id", sa.Integer))
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    # the table had no key: drop incomplete rows and collapse duplicates
+    conn.execute(participants.delete().where(
+        participants.c.chatroom_id.is_(None) | participants.c.user_id.is_(None)
+    ))
+    duplicates = conn.execute(
+        sa.select(participants.c.chatroom_id, participants.c.user_id)
+        .group_by(participants.c.chatroom_id, participants.c.user_id)
+        .having(sa.func.count() > 1)
+    ).all()
+    for room_id, user_id in duplicates:
+        conn.execute(participants.delete().where(participants.c.chatroom_id == room_id,
+                                                 participants.c.user_id == user_id))
+        conn.execute(participants.insert().values(chatroom_id=room_id, user_id=user_id))
+
+    with op.batch_alter_table("chatroom_participants") as batch_op:
+        batch_op.alter_column("chatroom_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column("user_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_primary_key("chatroom_participants_pkey", ["chatroom_id", "user_id"])
+    op.create_index("ix_chatroom_participants_user", "chatroom_participants",
+                    ["user_id", "chatroom_id"])
+
+    if duplicates:
+        # participant_count was backfilled with the duplicates counted
+        op.execute(
+            "UPDATE chatrooms SET participant_count = ("
+            "SELECT COUNT(*) FROM chatroom_participants "
+            "WHERE chatroom_participants.chatroom_id = chatrooms.id)"
+        )
+
+
+def downgrade():
+    op.drop_index("ix_chatroom_participants_user", table_name="chatroom_participants")
+    with op.batch_alter_table("chatroom_participants") as batch_op:
+        batch_op.drop_constraint("chatroom_participants_pkey", type_="primary")
+        batch_op.alter_column("user_id", existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column("chatroom_id", existing_type=sa.Integer(), nullable=True)
@@ -0,0 +1,51 @@
+"""indexed chatroom coordinates
+
+Revision ID: 509c5bced7c2
+Revises:
+Create Date: 2026-10-18 19:02:11.418310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '509c5bced7c2'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _backfill_coordinates(table_name):
+    """Copy location["latitude"/"longitude"] into the new float columns."""
+    table = sa.table(table_name, sa.column("id", sa.Integer), sa.column("location", sa.JSON),
+                     sa.column("latitude", sa.Float), sa.column("longitude", sa.Float))
+    conn = op.get_bind()
+    rows = []
+    for row_id, location in conn.execute(sa.select(table.c.id, table.c.location)):
+        try:
+            rows.append({"row_id": row_id, "lat": float(location["latitude"]),
+                         "lng": float(location["longitude"])})
+        except (KeyError, TypeError, ValueError):
+            continue        # no usable coordinates: stays NULL, as the model does
+    if rows:
+        conn.execute(
+            table.update().where(table.c.id == sa.bindparam("row_id"))
+            .values(latitude=sa.bindparam("lat"), longitude=sa.bindparam("lng")),
+            rows,
+        )
+
+
+def upgrade():
+    with op.batch_alter_table("chatrooms") as batch_op:
+        batch_op.add_column(sa.Column("latitude", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("longitude", sa.Float(), nullable=True))
+    _backfill_coordinates("chatrooms")
+    op.create_index("ix_chatrooms_geo", "chatrooms", ["is_private", "latitude", "longitude"])
+
+
+def downgrade():
+    op.drop_index("ix_chatrooms_geo", table_name="chatrooms")
+    with op.batch_alter_table("chatrooms") as batch_op:
+        batch_op.drop_column("longitude")
+        batch_op.drop_column("latitude")
@@ -0,0 +1,34 @@
+"""user search indexes
+
+Revision ID: 63549c5df492
+Revises: 1d647fe8f422
+Create Date: 2026-10-18 19:36:58.203117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.search import SEARCH_TABLE, ensure_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '63549c5df492'
+down_revision = '1d647fe8f422'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # PostgreSQL: pg_trgm + GIN trigram indexes; SQLite: FTS5 table and triggers
+    ensure_search_index(op.get_bind())
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_users_email_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_users_username_trgm")
+    elif dialect == "sqlite":
+        for suffix in ("au", "ad", "ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
@@ -0,0 +1,33 @@
+"""chatrooms.participant_count
+
+Revision ID: 79ed34463f62
+Revises: fb7e32eb47b4
+Create Date: 2026-10-18 19:13:05.877214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '79ed34463f62'
+down_revision = 'fb7e32eb47b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("chatrooms") as batch_op:
+        batch_op.add_column(sa.Column("participant_count", sa.Integer(), nullable=False,
+                                      server_default="0"))
+    # the counter is only ever incremented / decremented from here on
+    op.execute(
+        "UPDATE chatrooms SET participant_count = ("
+        "SELECT COUNT(*) FROM chatroom_participants "
+        "WHERE chatroom_participants.chatroom_id = chatrooms.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("chatrooms") as batch_op:
+        batch_op.drop_column("participant_count")
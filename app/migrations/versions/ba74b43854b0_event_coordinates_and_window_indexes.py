@@ -0,0 +1,54 @@
+"""event coordinates and time-window indexes
+
+Revision ID: ba74b43854b0
+Revises: 63549c5df492
+Create Date: 2026-10-18 19:44:21.950784
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ba74b43854b0'
+down_revision = '63549c5df492'
+branch_labels = None
+depends_on = None
+
+
+def _backfill_coordinates(table_name):
+    """Copy location["latitude"/"longitude"] into the new float columns."""
+    table = sa.table(table_name, sa.column("id", sa.Integer), sa.column("location", sa.JSON),
+                     sa.column("latitude", sa.Float), sa.column("longitude", sa.Float))
+    conn = op.get_bind()
+    rows = []
+    for row_id, location in conn.execute(sa.select(table.c.id, table.c.location)):
+        try:
+            rows.append({"row_id": row_id, "lat": float(location["latitude"]),
+                         "lng": float(location["longitude"])})
+        except (KeyError, TypeError, ValueError):
+            continue        # no usable coordinates: stays NULL, as the model does
+    if rows:
+        conn.execute(
+            table.update().where(table.c.id == sa.bindparam("row_id"))
+            .values(latitude=sa.bindparam("lat"), longitude=sa.bindparam("lng")),
+            rows,
+        )
+
+
+def upgrade():
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.add_column(sa.Column("latitude", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("longitude", sa.Float(), nullable=True))
+    _backfill_coordinates("events")
+    op.create_index("ix_events_public_category_date", "events",
+                    ["is_public", "category", "event_date"])
+    op.create_index("ix_events_public_date", "events", ["is_public", "event_date"])
+
+
+def downgrade():
+    op.drop_index("ix_events_public_date", table_name="events")
+    op.drop_index("ix_events_public_category_date", table_name="events")
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.drop_column("longitude")
+        batch_op.drop_column("latitude")
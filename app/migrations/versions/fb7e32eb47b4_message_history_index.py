@@ -0,0 +1,24 @@
+"""keyset index for message history
+
+Revision ID: fb7e32eb47b4
+Revises: 509c5bced7c2
+Create Date: 2026-10-18 19:09:40.102377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fb7e32eb47b4'
+down_revision = '509c5bced7c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_messages_room_created_id", "messages", ["chatroom_id", "created_at", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_messages_room_created_id", table_name="messages")
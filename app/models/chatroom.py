@@ -1,14 +1,30 @@
+from sqlalchemy import exists, update
 from sqlalchemy.sql import func
 from app.extensions import db
+from app.models.geo import GeoLocated
+from app.utils.cache import TTLCache, invalidate_on_commit
+from app.utils.presence import presence
 
 chatroom_participants = db.Table(
     "chatroom_participants",
     db.Column("user_id",     db.Integer, db.ForeignKey("users.id")),
     db.Column("chatroom_id", db.Integer, db.ForeignKey("chatrooms.id")),
+    db.PrimaryKeyConstraint("chatroom_id", "user_id"),
+    # "rooms of a user" lookups walk the PK the other way round
+    db.Index("ix_chatroom_participants_user", "user_id", "chatroom_id"),
 )
 
-class Chatroom(db.Model):
+# (room_id, user_id) -> bool; short TTL so other workers' joins/leaves
+# show up quickly. Only the Socket.IO send path reads through it.
+membership_cache = TTLCache(maxsize=50_000, ttl=5.0)
+
+
+class Chatroom(GeoLocated, db.Model):
     __tablename__ = "chatrooms"
+    __table_args__ = (
+        # bounding-box prefilter for discovery (see Chatroom.near)
+        db.Index("ix_chatrooms_geo", "is_private", "latitude", "longitude"),
+    )
 
     id    = db.Column(db.Integer, primary_key=True)
     name  = db.Column(db.String(200), nullable=False)
@@ -20,11 +36,130 @@ class Chatroom(db.Model):
     created_by  = db.Column(db.Integer, db.ForeignKey("users.id"))
     created_at  = db.Column(db.DateTime(timezone=True), server_default=func.now())
 
+    # maintained by add_participant / remove_participant, never recounted
+    participant_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     # relations
     participants = db.relationship("User", secondary=chatroom_participants, backref="chatrooms")
     business     = db.relationship("User", foreign_keys=[business_id])
     creator      = db.relationship("User", foreign_keys=[created_by])
 
+    @classmethod
+    def has_participant(cls, session, room_id, user_id, cached=False):
+        """
+        Membership as one EXISTS probe on the (chatroom_id, user_id) key.
+        With `cached=True` the answer may be up to membership_cache.ttl old.
+        """
+        key = (int(room_id), int(user_id))
+        if cached:
+            hit = membership_cache.get(key)
+            if hit is not None:
+                return hit
+
+        member = session.query(
+            exists().where(
+                chatroom_participants.c.chatroom_id == key[0],
+                chatroom_participants.c.user_id == key[1],
+            )
+        ).scalar()
+        if cached:
+            membership_cache.set(key, member)
+        return member
+
+    @classmethod
+    def add_participant(cls, session, room_id, user_id):
+        """
+        Reserve a seat with a single conditional UPDATE and record the
+        membership. Returns False when the room is full. Does not commit.
+        """
+        seat = session.execute(
+            update(cls)
+            .where(cls.id == room_id,
+                   cls.participant_count < cls.max_participants)
+            .values(participant_count=cls.participant_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if not seat.rowcount:
+            return False
+        session.execute(
+            chatroom_participants.insert().values(chatroom_id=room_id, user_id=user_id)
+        )
+        invalidate_on_commit(session, membership_cache, (int(room_id), int(user_id)))
+        return True
+
+    @classmethod
+    def add_participants(cls, session, room_ids, user_id):
+        """
+        Join one user to many rooms: one membership probe, one conditional
+        UPDATE ... RETURNING for the seats and one bulk INSERT.
+        Returns {room_id: "joined" | "member" | "full" | "not_found"}.
+        Does not commit.
+        """
+        room_ids = {int(r) for r in room_ids}
+        found = {
+            rid for (rid,) in session.query(cls.id).filter(cls.id.in_(room_ids))
+        }
+        member = {
+            rid for (rid,) in session.query(chatroom_participants.c.chatroom_id).filter(
+                chatroom_participants.c.chatroom_id.in_(found),
+                chatroom_participants.c.user_id == user_id,
+            )
+        }
+        wanted = found - member
+
+        if not session.get_bind().dialect.update_returning:
+            seated = {rid for rid in wanted if cls.add_participant(session, rid, user_id)}
+        else:
+            seated = set()
+            if wanted:
+                seated = set(session.execute(
+                    update(cls)
+                    .where(cls.id.in_(wanted),
+                           cls.participant_count < cls.max_participants)
+                    .values(participant_count=cls.participant_count + 1)
+                    .returning(cls.id)
+                    .execution_options(synchronize_session=False)
+                ).scalars())
+            if seated:
+                session.execute(
+                    chatroom_participants.insert(),
+                    [{"chatroom_id": rid, "user_id": user_id} for rid in seated],
+                )
+                for rid in seated:
+                    invalidate_on_commit(session, membership_cache, (rid, int(user_id)))
+
+        def outcome(rid):
+            if rid not in found:
+                return "not_found"
+            if rid in member:
+                return "member"
+            return "joined" if rid in seated else "full"
+
+        return {rid: outcome(rid) for rid in room_ids}
+
+    @classmethod
+    def remove_participant(cls, session, room_id, user_id):
+        """
+        Drop a membership and release its seat. Returns False if the user
+        was not a participant. Does not commit.
+        """
+        removed = session.execute(
+            chatroom_participants.delete().where(
+                chatroom_participants.c.chatroom_id == room_id,
+                chatroom_participants.c.user_id == user_id,
+            )
+        ).rowcount
+        if not removed:
+            return False
+        invalidate_on_commit(session, membership_cache, (int(room_id), int(user_id)))
+        session.execute(
+            update(cls)
+            .where(cls.id == room_id)
+            .values(participant_count=cls.participant_count - removed)
+            .execution_options(synchronize_session=False)
+        )
+        return True
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -35,8 +170,9 @@ class Chatroom(db.Model):
             "location": self.location,
             "is_private": self.is_private,
             "max_participants": self.max_participants,
-            "participant_count": len(self.participants),
+            "participant_count": self.participant_count or 0,
+            "online_count": presence.online_count(self.id),
             "created_by": self.created_by,
             "creator_name": self.creator.username if self.creator else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at,
         }
@@ -1,8 +1,17 @@
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload
 from sqlalchemy.sql import func
 from app.extensions import db
+from app.models.geo import GeoLocated
+from app.utils.helpers import encode_cursor, decode_cursor
 
-class Event(db.Model):
+class Event(GeoLocated, db.Model):
     __tablename__ = "events"
+    __table_args__ = (
+        # time-window listings, with and without a category (see Event.window)
+        db.Index("ix_events_public_category_date", "is_public", "category", "event_date"),
+        db.Index("ix_events_public_date", "is_public", "event_date"),
+    )
 
     id          = db.Column(db.Integer, primary_key=True)
     title       = db.Column(db.String(200), nullable=False)
@@ -17,6 +26,31 @@ class Event(db.Model):
 
     business = db.relationship("User", backref="events")
 
+    @property
+    def cursor(self):
+        return encode_cursor(self.event_date, self.id)
+
+    @classmethod
+    def window(cls, session, start, end=None, category=None, after=None):
+        """
+        Public events with start <= event_date < end, soonest first, as a
+        query ready for .limit(). `after` is a cursor from Event.cursor and
+        pages on the (is_public[, category], event_date) indexes.
+        Raises ValueError for malformed cursors.
+        """
+        query = (
+            session.query(cls)
+            .options(joinedload(cls.business))
+            .filter(cls.is_public.is_(True), cls.event_date >= start)
+        )
+        if end is not None:
+            query = query.filter(cls.event_date < end)
+        if category:
+            query = query.filter(cls.category == category)
+        if after:
+            query = query.filter(tuple_(cls.event_date, cls.id) > decode_cursor(after))
+        return query.order_by(cls.event_date.asc(), cls.id.asc())
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -25,9 +59,9 @@ class Event(db.Model):
             "business_id": self.business_id,
             "business_name": self.business.username if self.business else None,
             "location": self.location,
-            "event_date": self.event_date.isoformat() if self.event_date else None,
+            "event_date": self.event_date,
             "max_attendees": self.max_attendees,
             "category": self.category,
             "is_public": self.is_public,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at,
         }
@@ -0,0 +1,40 @@
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import validates
+from app.extensions import db
+from app.utils.helpers import bounding_box
+
+
+class GeoLocated:
+    """
+    Mixin for models with a JSON `location` ({"latitude", "longitude", ...}).
+    Keeps indexed float copies of the coordinates in sync with it.
+    """
+
+    # indexed copy of location["latitude"/"longitude"], kept in sync by _sync_coordinates
+    latitude  = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+
+    @validates("location")
+    def _sync_coordinates(self, key, location):
+        lat = lng = None
+        if isinstance(location, dict):
+            try:
+                lat = float(location["latitude"])
+                lng = float(location["longitude"])
+            except (KeyError, TypeError, ValueError):
+                lat = lng = None
+        self.latitude, self.longitude = lat, lng
+        return location
+
+    @classmethod
+    def near(cls, lat, lng, radius_km):
+        """
+        SQL filter matching rows inside the bounding box of a search circle.
+        Callers still apply the exact Haversine check to the candidates.
+        """
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+        lat_ok = cls.latitude.between(min_lat, max_lat)
+        if min_lng <= max_lng:
+            return and_(lat_ok, cls.longitude.between(min_lng, max_lng))
+        # box wraps around the antimeridian
+        return and_(lat_ok, or_(cls.longitude >= min_lng, cls.longitude <= max_lng))
@@ -1,8 +1,17 @@
+from sqlalchemy import select, tuple_, union_all
 from sqlalchemy.sql import func
 from app.extensions import db
+from app.models.user import User
+from app.utils.helpers import encode_cursor, decode_cursor
 
 class Message(db.Model):
     __tablename__ = "messages"
+    __table_args__ = (
+        # keyset pagination over a room's history (see Message.history)
+        db.Index("ix_messages_room_created_id", "chatroom_id", "created_at", "id"),
+        # "everything after message N" per room (see Message.since)
+        db.Index("ix_messages_room_id", "chatroom_id", "id"),
+    )
 
     id          = db.Column(db.Integer, primary_key=True)
     chatroom_id = db.Column(db.Integer, db.ForeignKey("chatrooms.id"), nullable=False)
@@ -17,7 +26,88 @@ class Message(db.Model):
     user     = db.relationship("User",     backref="messages")
     chatroom = db.relationship("Chatroom", backref="messages")
 
-    def to_dict(self):
+    @property
+    def cursor(self):
+        return encode_cursor(self.created_at, self.id)
+
+    @classmethod
+    def history(cls, session, room_id, limit=50, offset=0, before=None, after=None):
+        """
+        One page of a room's messages in chronological order.
+
+        `before` / `after` are cursors from Message.cursor and page on the
+        (chatroom_id, created_at, id) index; `offset` is kept for older
+        clients and only applies when neither cursor is given.
+        Raises ValueError for malformed cursors.
+        """
+        key = tuple_(cls.created_at, cls.id)
+        query = session.query(cls).filter(cls.chatroom_id == room_id)
+
+        if after:
+            return (
+                query.filter(key > decode_cursor(after))
+                .order_by(cls.created_at.asc(), cls.id.asc())
+                .limit(limit)
+                .all()
+            )
+
+        query = query.order_by(cls.created_at.desc(), cls.id.desc())
+        if before:
+            query = query.filter(key < decode_cursor(before))
+        elif offset:
+            query = query.offset(offset)
+        msgs = query.limit(limit).all()
+        return list(reversed(msgs))
+
+    @classmethod
+    def since(cls, session, last_seen, limit=100):
+        """
+        Messages newer than the given id in each room, for many rooms in
+        one statement: {room_id: last_seen_id} -> {room_id: [Message, ...]}
+        in id order. Each room gets up to limit + 1 rows so callers can
+        tell whether more is waiting.
+        """
+        if not last_seen:
+            return {}
+        per_room = [
+            select(cls.id)
+            .where(cls.chatroom_id == room_id, cls.id > last_id)
+            .order_by(cls.id)
+            .limit(limit + 1)
+            .subquery()
+            for room_id, last_id in last_seen.items()
+        ]
+        ids = union_all(*(select(sq.c.id) for sq in per_room))
+        found = {room_id: [] for room_id in last_seen}
+        for msg in session.query(cls).filter(cls.id.in_(ids)).order_by(cls.chatroom_id, cls.id):
+            found[msg.chatroom_id].append(msg)
+        return found
+
+    @staticmethod
+    def author_map(session, messages):
+        """
+        {user_id: (username, profile_picture)} for the authors of `messages`,
+        fetched in one query; repeated authors are looked up once.
+        """
+        ids = {m.user_id for m in messages}
+        if not ids:
+            return {}
+        rows = (
+            session.query(User.id, User.username, User.profile_picture)
+            .filter(User.id.in_(ids))
+            .all()
+        )
+        return {uid: (username, picture) for uid, username, picture in rows}
+
+    def to_dict(self, authors=None):
+        # serialize from a prefetched author_map when given, instead of
+        # lazy-loading self.user once per message
+        if authors is not None:
+            username, picture = authors.get(self.user_id, (None, None))
+        elif self.user:
+            username, picture = self.user.username, self.user.profile_picture
+        else:
+            username = picture = None
         return {
             "id": self.id,
             "chatroom_id": self.chatroom_id,
@@ -25,7 +115,7 @@ class Message(db.Model):
             "content": self.content,
             "message_type": self.message_type,
             "media_url": self.media_url,
-            "username": self.user.username if self.user else None,
-            "profile_picture": self.user.profile_picture if self.user else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "username": username,
+            "profile_picture": picture,
+            "created_at": self.created_at,
         }
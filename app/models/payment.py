@@ -13,7 +13,7 @@ class Payment(db.Model):
     payment_method = db.Column(db.String(100))
     stripe_payment_intent_id = db.Column(db.String(255))
     description = db.Column(db.Text)
-    metadata    = db.Column(db.JSON)
+    metadata_   = db.Column("metadata", db.JSON)  # `metadata` is reserved by Declarative
 
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
     updated_at = db.Column(db.DateTime(timezone=True), onupdate=func.now())
@@ -29,5 +29,5 @@ class Payment(db.Model):
             "status": self.status,
             "payment_method": self.payment_method,
             "description": self.description,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at,
         }
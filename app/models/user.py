@@ -1,6 +1,8 @@
-import bcrypt
+from sqlalchemy import event
+from sqlalchemy.orm import attributes
 from sqlalchemy.sql import func
 from app.extensions import db
+from app.utils import passwords
 
 class User(db.Model):
     __tablename__ = "users"
@@ -16,15 +18,22 @@ class User(db.Model):
     location        = db.Column(db.JSON)
     is_active       = db.Column(db.Boolean, default=True)
 
+    # bumped whenever a change must invalidate issued tokens (role, status);
+    # carried in the JWT "ver" claim
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
     updated_at = db.Column(db.DateTime(timezone=True), onupdate=func.now())
 
     # helpers
     def set_password(self, raw):
-        self.password = bcrypt.hashpw(raw.encode(), bcrypt.gensalt()).decode()
+        self.password = passwords.hash_password(raw)
 
     def verify_password(self, raw):
-        return bcrypt.checkpw(raw.encode(), self.password.encode())
+        return passwords.verify_password(raw, self.password)
+
+    def password_needs_rehash(self):
+        return passwords.needs_rehash(self.password)
 
     def to_dict(self):
         return {
@@ -36,6 +45,16 @@ class User(db.Model):
             "user_type": self.user_type,
             "location": self.location,
             "is_active": self.is_active,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
+
+
+# fields baked into access-token claims; changing any of them revokes tokens
+TOKEN_FIELDS = ("user_type", "is_active")
+
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(mapper, connection, target):
+    if any(attributes.get_history(target, f).has_changes() for f in TOKEN_FIELDS):
+        target.token_version = (target.token_version or 0) + 1
@@ -1,12 +1,13 @@
 # app/routes/auth.py
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import (
-    create_access_token,
+    current_user,
     jwt_required,
     get_jwt_identity,
 )
 from app.database import get_db            # <— clean import via __init__.py
 from app.models.user import User
+from app.utils.identity import issue_access_token
 from app.utils.validators import validate_email, validate_password
 
 auth_bp = Blueprint("auth", __name__)
@@ -47,7 +48,7 @@ def register():
     db.add(user)
     db.commit()
 
-    access_token = create_access_token(identity=str(user.id))
+    access_token = issue_access_token(user)
     return (
         jsonify(message="User created successfully",
                 access_token=access_token,
@@ -74,8 +75,11 @@ def login():
         return jsonify(error="Invalid credentials"), 401
     if not user.is_active:
         return jsonify(error="Account is deactivated"), 403
+    if user.password_needs_rehash():
+        user.set_password(password)
+        db.commit()
 
-    access_token = create_access_token(identity=str(user.id))
+    access_token = issue_access_token(user)
     return jsonify(
         message="Login successful",
         access_token=access_token,
@@ -89,12 +93,8 @@ def login():
 @auth_bp.get("/profile")
 @jwt_required()
 def get_profile():
-    db = get_db()
-    user_id = get_jwt_identity()
-    user = db.query(User).get(int(user_id))
-    if not user:
-        return jsonify(error="User not found"), 404
-    return jsonify(user=user.to_dict()), 200
+    # served from the identity cache; no DB round trip on a hit
+    return jsonify(user=current_user.profile), 200
 
 
 # ---------------------------------------------------------------------------
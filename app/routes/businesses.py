@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload
 from app.database import get_db
 from app.models.user     import User
 from app.models.chatroom import Chatroom
 from app.models.event    import Event
+from app.utils.decorators import business_required
+from app.utils.json_provider import stream_json_list
 
 businesses_bp = Blueprint("businesses", __name__)
 
@@ -12,13 +15,10 @@ businesses_bp = Blueprint("businesses", __name__)
 # ---------------------------------------------------------------------------
 @businesses_bp.put("/profile")
 @jwt_required()
+@business_required
 def update_business_profile():
     db = get_db()
-    user_id = get_jwt_identity()
-    user = db.query(User).get(user_id)
-
-    if not user or user.user_type != "business":
-        return jsonify(error="Business account required"), 403
+    user = db.query(User).get(int(get_jwt_identity()))
 
     data = request.get_json() or {}
     for field in ("location", "bio", "profile_picture"):
@@ -34,16 +34,18 @@ def update_business_profile():
 # ---------------------------------------------------------------------------
 @businesses_bp.get("/my-chatrooms")
 @jwt_required()
+@business_required
 def get_my_chatrooms():
     db = get_db()
     user_id = get_jwt_identity()
-    user = db.query(User).get(user_id)
 
-    if not user or user.user_type != "business":
-        return jsonify(error="Business account required"), 403
-
-    rooms = db.query(Chatroom).filter(Chatroom.business_id == user_id).all()
-    return jsonify(chatrooms=[r.to_dict() for r in rooms]), 200
+    rooms = (
+        db.query(Chatroom)
+        .options(joinedload(Chatroom.business), joinedload(Chatroom.creator))
+        .filter(Chatroom.business_id == user_id)
+        .order_by(Chatroom.id)
+    )
+    return stream_json_list("chatrooms", rooms)
 
 
 # ---------------------------------------------------------------------------
@@ -51,13 +53,15 @@ def get_my_chatrooms():
 # ---------------------------------------------------------------------------
 @businesses_bp.get("/my-events")
 @jwt_required()
+@business_required
 def get_my_events():
     db = get_db()
     user_id = get_jwt_identity()
-    user = db.query(User).get(user_id)
-
-    if not user or user.user_type != "business":
-        return jsonify(error="Business account required"), 403
 
-    events = db.query(Event).filter(Event.business_id == user_id).all()
-    return jsonify(events=[e.to_dict() for e in events]), 200
+    events = (
+        db.query(Event)
+        .options(joinedload(Event.business))
+        .filter(Event.business_id == user_id)
+        .order_by(Event.event_date, Event.id)
+    )
+    return stream_json_list("events", events)
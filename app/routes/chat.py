@@ -1,30 +1,31 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, session
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import and_, event as sa_event
+from sqlalchemy.orm import attributes, joinedload
 from app.database import get_db
-from app.models.chatroom import Chatroom
+from app.models.chatroom import Chatroom, chatroom_participants
 from app.models.message  import Message
-from app.models.user     import User
+from app.models.user import User
+from app.utils.identity import identity_from_token, load_user
+from app.utils.helpers import batch_distance, encode_cursor
+from app.utils.instrumentation import instrumented
+from app.utils.json_provider import stream_json_list
+from app.utils.message_buffer import message_buffer
+from app.utils.message_writer import message_writer
+from app.utils.presence import presence
 from datetime import datetime
-import math
 
 from app.extensions import socketio
-from flask_socketio import join_room, leave_room, emit
+from flask_socketio import ConnectionRefusedError, join_room, leave_room, emit
 
 chat_bp = Blueprint("chat", __name__)
 
-# ---------------------------------------------------------------------------
-# Haversine helper
-# ---------------------------------------------------------------------------
-def _distance_km(lat1, lon1, lat2, lon2):
-    R = 6371.0
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(math.radians(lat1)) *
-         math.cos(math.radians(lat2)) *
-         math.sin(dlon / 2) ** 2)
-    return R * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
 
+@sa_event.listens_for(User, "after_update")
+def _author_changed(mapper, connection, target):
+    # buffered messages embed username / profile_picture
+    if any(attributes.get_history(target, f).has_changes() for f in ("username", "profile_picture")):
+        message_buffer.clear()
 
 # ---------------------------------------------------------------------------
 # List / discover chatrooms
@@ -37,16 +38,22 @@ def get_chatrooms():
     lng  = request.args.get("lng", type=float)
     maxd = request.args.get("max_distance", 10, type=float)
 
-    rooms = db.query(Chatroom).filter(Chatroom.is_private.is_(False)).all()
+    query = (
+        db.query(Chatroom)
+        .options(joinedload(Chatroom.business), joinedload(Chatroom.creator))
+        .filter(Chatroom.is_private.is_(False))
+    )
     if lat and lng:
-        rooms = [
-            r for r in rooms
-            if r.location and
-               _distance_km(lat, lng,
-                            r.location.get("latitude", 0),
-                            r.location.get("longitude", 0)) <= maxd
-        ]
-    return jsonify(chatrooms=[r.to_dict() for r in rooms]), 200
+        # indexed bounding-box prefilter, exact distance on the survivors
+        rooms = query.filter(Chatroom.near(lat, lng, maxd)).all()
+        hits = batch_distance(lat, lng,
+                              [r.latitude for r in rooms],
+                              [r.longitude for r in rooms], maxd)
+        rooms = [rooms[i] for i in hits.order]
+        return jsonify(chatrooms=[r.to_dict() for r in rooms]), 200
+
+    # no geo filter: every public room, streamed
+    return stream_json_list("chatrooms", query.order_by(Chatroom.id))
 
 
 # ---------------------------------------------------------------------------
@@ -61,6 +68,10 @@ def create_chatroom():
 
     if not data.get("name"):
         return jsonify(error="Chatroom name is required"), 400
+    max_participants = data.get("max_participants", 100)
+    if not isinstance(max_participants, int) or isinstance(max_participants, bool) \
+            or max_participants < 1:
+        return jsonify(error="max_participants must be a positive integer"), 400
 
     room = Chatroom(
         name=data["name"],
@@ -68,15 +79,16 @@ def create_chatroom():
         business_id=data.get("business_id"),
         location=data.get("location", {}),
         is_private=data.get("is_private", False),
-        max_participants=data.get("max_participants", 100),
+        max_participants=max_participants,
         created_by=user_id,
     )
     db.add(room)
-    db.commit()
+    db.flush()
 
     # add creator as participant
-    creator = db.query(User).get(user_id)
-    room.participants.append(creator)
+    if not Chatroom.add_participant(db, room.id, user_id):
+        db.rollback()
+        return jsonify(error="Could not seat the creator in the chatroom"), 400
     db.commit()
 
     return jsonify(message="Chatroom created", chatroom=room.to_dict()), 201
@@ -95,16 +107,75 @@ def join_chatroom(room_id):
     if not room:
         return jsonify(error="Chatroom not found"), 404
 
-    user = db.query(User).get(user_id)
-    if user not in room.participants:
-        if len(room.participants) >= room.max_participants:
+    if not Chatroom.has_participant(db, room_id, user_id):
+        if not Chatroom.add_participant(db, room_id, user_id):
+            db.rollback()
             return jsonify(error="Chatroom is full"), 400
-        room.participants.append(user)
         db.commit()
 
     return jsonify(message="Joined chatroom", chatroom=room.to_dict()), 200
 
 
+# ---------------------------------------------------------------------------
+# Join several chatrooms  (one transaction, per-room results)
+# ---------------------------------------------------------------------------
+_JOIN_ERRORS = {"full": "Chatroom is full", "not_found": "Chatroom not found"}
+
+
+@chat_bp.post("/rooms/join")
+@jwt_required()
+def join_chatrooms():
+    db = get_db()
+    user_id = int(get_jwt_identity())
+    room_ids = (request.get_json() or {}).get("room_ids")
+
+    if not isinstance(room_ids, list) or not room_ids:
+        return jsonify(error="room_ids must be a non-empty list"), 400
+    if len(room_ids) > current_app.config["BULK_MAX_ITEMS"]:
+        return jsonify(error=f"At most {current_app.config['BULK_MAX_ITEMS']} rooms per request"), 400
+    if not all(isinstance(r, int) and not isinstance(r, bool) for r in room_ids):
+        return jsonify(error="room_ids must be integers"), 400
+
+    outcome = Chatroom.add_participants(db, room_ids, user_id)
+    db.commit()
+
+    ok = [rid for rid, result in outcome.items() if result in ("joined", "member")]
+    rooms = {
+        r.id: r
+        for r in db.query(Chatroom)
+        .options(joinedload(Chatroom.business), joinedload(Chatroom.creator))
+        .filter(Chatroom.id.in_(ok))
+    }
+    results = []
+    for rid in room_ids:
+        if outcome[rid] in _JOIN_ERRORS:
+            results.append(dict(room_id=rid, status=outcome[rid], error=_JOIN_ERRORS[outcome[rid]]))
+        else:
+            results.append(dict(room_id=rid, status=outcome[rid], chatroom=rooms[rid].to_dict()))
+
+    status = 200 if len(ok) == len(outcome) else 207 if ok else 400
+    return jsonify(results=results), status
+
+
+# ---------------------------------------------------------------------------
+# Leave chatroom
+# ---------------------------------------------------------------------------
+@chat_bp.post("/rooms/<int:room_id>/leave")
+@jwt_required()
+def leave_chatroom(room_id):
+    db = get_db()
+    user_id = get_jwt_identity()
+
+    room = db.query(Chatroom).get(room_id)
+    if not room:
+        return jsonify(error="Chatroom not found"), 404
+
+    if Chatroom.remove_participant(db, room_id, user_id):
+        db.commit()
+
+    return jsonify(message="Left chatroom", chatroom=room.to_dict()), 200
+
+
 # ---------------------------------------------------------------------------
 # Get messages
 # ---------------------------------------------------------------------------
@@ -115,24 +186,130 @@ def get_messages(room_id):
     user_id = get_jwt_identity()
     limit  = request.args.get("limit", 50, type=int)
     offset = request.args.get("offset", 0,  type=int)
+    before = request.args.get("before")
+    after  = request.args.get("after")
 
     room = db.query(Chatroom).get(room_id)
-    user = db.query(User).get(user_id)
 
     if not room:
         return jsonify(error="Chatroom not found"), 404
-    if room.is_private and user not in room.participants:
+    if room.is_private and not Chatroom.has_participant(db, room_id, user_id):
         return jsonify(error="Access denied"), 403
 
-    msgs = (
-        db.query(Message)
-        .filter(Message.chatroom_id == room_id)
-        .order_by(Message.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-    return jsonify(messages=[m.to_dict() for m in reversed(msgs)]), 200
+    newest_page = not (offset or before or after) and limit > 0
+    if newest_page:
+        page = _latest_messages(db, room_id, limit)
+        if page is not None:
+            next_cursor = (encode_cursor(page[0]["created_at"], page[0]["id"])
+                           if page and len(page) == limit else None)
+            return jsonify(messages=page, next_cursor=next_cursor), 200
+
+    try:
+        msgs = Message.history(db, room_id, limit=limit, offset=offset,
+                               before=before, after=after)
+    except ValueError:
+        return jsonify(error="Invalid cursor"), 400
+
+    # forward paging always hands back a position to poll from; backward
+    # paging stops once the start of the history is reached
+    if after:
+        next_cursor = msgs[-1].cursor if msgs else after
+    else:
+        next_cursor = msgs[0].cursor if msgs and len(msgs) == limit else None
+    authors = Message.author_map(db, msgs)
+    return jsonify(messages=[m.to_dict(authors) for m in msgs],
+                   next_cursor=next_cursor), 200
+
+
+def _latest_messages(db, room_id, limit):
+    """
+    Newest page from the ring buffer, warming the room on a miss.
+    None when the page is bigger than the buffer holds.
+    """
+    page = message_buffer.latest(room_id, limit)
+    if page is not None or not message_buffer.enabled or limit > message_buffer.capacity:
+        return page
+    generation = message_buffer.generation(room_id)
+    msgs = Message.history(db, room_id, limit=message_buffer.capacity)
+    authors = Message.author_map(db, msgs)
+    serialized = [m.to_dict(authors) for m in msgs]
+    message_buffer.warm(room_id, serialized, generation)
+    return serialized[-limit:]
+
+
+# ---------------------------------------------------------------------------
+# Delta sync  (reconnecting clients: everything after the last seen id,
+# for all their rooms, in one round trip)
+# ---------------------------------------------------------------------------
+SYNC_DEFAULT_LIMIT = 100
+SYNC_MAX_LIMIT = 500
+
+
+def _parse_sync(data):
+    """
+    {"rooms": {room_id: last_seen_id}, "limit": n} ->
+    ({room_id: last_seen_id}, per-room limit, None) or (None, None, error).
+    """
+    rooms = data.get("rooms") if isinstance(data, dict) else None
+    if not isinstance(rooms, dict) or not rooms:
+        return None, None, "rooms must be a non-empty object of {room_id: last_seen_id}"
+    if len(rooms) > current_app.config["BULK_MAX_ITEMS"]:
+        return None, None, f"At most {current_app.config['BULK_MAX_ITEMS']} rooms per request"
+    try:
+        last_seen = {int(rid): last for rid, last in rooms.items()}
+    except (TypeError, ValueError):
+        return None, None, "room ids must be integers"
+    if not all(isinstance(v, int) and not isinstance(v, bool) and v >= 0 for v in last_seen.values()):
+        return None, None, "last seen ids must be non-negative integers"
+    limit = data.get("limit", SYNC_DEFAULT_LIMIT)
+    if not isinstance(limit, int) or isinstance(limit, bool):
+        return None, None, "limit must be an integer"
+    return last_seen, max(1, min(limit, SYNC_MAX_LIMIT)), None
+
+
+def _sync(db, last_seen, user_id, limit):
+    """Per-room sync results plus the bulk-endpoint status code."""
+    access = {
+        rid: not private or member is not None
+        for rid, private, member in db.query(
+            Chatroom.id, Chatroom.is_private, chatroom_participants.c.user_id
+        )
+        .outerjoin(chatroom_participants, and_(
+            chatroom_participants.c.chatroom_id == Chatroom.id,
+            chatroom_participants.c.user_id == user_id,
+        ))
+        .filter(Chatroom.id.in_(last_seen))
+    }
+    allowed = {rid: last for rid, last in last_seen.items() if access.get(rid)}
+    found = Message.since(db, allowed, limit=limit)
+    authors = Message.author_map(db, [m for msgs in found.values() for m in msgs])
+
+    results = []
+    for rid in last_seen:
+        if rid not in access:
+            results.append(dict(room_id=rid, status="not_found", error="Chatroom not found"))
+        elif not access[rid]:
+            results.append(dict(room_id=rid, status="forbidden", error="Access denied"))
+        else:
+            msgs = found[rid]
+            results.append(dict(room_id=rid, status="ok",
+                                messages=[m.to_dict(authors) for m in msgs[:limit]],
+                                has_more=len(msgs) > limit))
+
+    status = 200 if len(allowed) == len(last_seen) else 207 if allowed else 400
+    return results, status
+
+
+@chat_bp.post("/sync")
+@jwt_required()
+def sync_messages():
+    db = get_db()
+    last_seen, limit, error = _parse_sync(request.get_json() or {})
+    if error:
+        return jsonify(error=error), 400
+
+    results, status = _sync(db, last_seen, int(get_jwt_identity()), limit)
+    return jsonify(results=results), status
 
 
 # ---------------------------------------------------------------------------
@@ -145,41 +322,101 @@ def get_chatroom(room_id):
     user_id = get_jwt_identity()
 
     room = db.query(Chatroom).get(room_id)
-    user = db.query(User).get(user_id)
 
     if not room:
         return jsonify(error="Chatroom not found"), 404
-    if room.is_private and user not in room.participants:
+    if room.is_private and not Chatroom.has_participant(db, room_id, user_id):
         return jsonify(error="Access denied"), 403
     return jsonify(chatroom=room.to_dict()), 200
 
 
 # =============================  Socket.IO  ================================= #
+def _socket_user_id():
+    """User authenticated at connect time, or None for an anonymous socket."""
+    return session.get("socket_user_id")
+
+
 @socketio.on("connect")
-def _sio_connect():
+def _sio_connect(auth=None):
+    # clients authenticate with io(url, {auth: {token: <access token>}})
+    token = auth.get("token") if isinstance(auth, dict) else None
+    if token is not None:
+        user_id = identity_from_token(token)
+        if user_id is None:
+            raise ConnectionRefusedError("Invalid or expired token")
+        session["socket_user_id"] = user_id
     print("Client connected")
 
 
 @socketio.on("disconnect")
 def _sio_disconnect():
+    presence.disconnect(request.sid)
     print("Client disconnected")
 
 
+def _event_room_id(data):
+    """chatroom_id of a socket payload as an int (ints or digit strings), else None."""
+    room_id = data.get("chatroom_id") if isinstance(data, dict) else None
+    if isinstance(room_id, str) and room_id.isdigit():
+        return int(room_id)
+    if isinstance(room_id, int) and not isinstance(room_id, bool):
+        return room_id
+    return None
+
+
 @socketio.on("join_room")
+@instrumented("join_room")
 def _sio_join(data):
-    room_id = data.get("chatroom_id")
+    room_id = _event_room_id(data)
+    if room_id is None:
+        emit("error", {"error": "chatroom_id must be an integer"})
+        return
     join_room(str(room_id))
+    presence.join(request.sid, room_id, _socket_user_id())
     print("Socket joined room", room_id)
 
 
 @socketio.on("leave_room")
+@instrumented("leave_room")
 def _sio_leave(data):
-    room_id = data.get("chatroom_id")
+    room_id = _event_room_id(data)
+    if room_id is None:
+        emit("error", {"error": "chatroom_id must be an integer"})
+        return
     leave_room(str(room_id))
+    presence.leave(request.sid, room_id)
     print("Socket left room", room_id)
 
 
+@socketio.on("resume")
+@instrumented("resume")
+def _sio_resume(data):
+    """
+    Reconnect in one event: rejoin every room the client could read and
+    get what it missed there (same payload as POST /api/chat/sync).
+    Only for sockets that connected with an access token. Answers with
+    a `resumed` event.
+    """
+    db = get_db()
+    user_id = _socket_user_id()
+    if user_id is None:
+        emit("error", {"error": "Authentication required"})
+        return
+    last_seen, limit, error = _parse_sync(data)
+    if error:
+        emit("error", {"error": error})
+        return
+
+    results, _ = _sync(db, last_seen, user_id, limit)
+    for result in results:
+        if result["status"] == "ok":
+            join_room(str(result["room_id"]))
+            presence.join(request.sid, result["room_id"], user_id)
+    emit("resumed", {"results": results})
+
+
 @socketio.on("send_message")
+@instrumented("send_message")
 def _sio_send(data):
     db = get_db()
     room_id = data.get("chatroom_id")
@@ -191,15 +428,15 @@ def _sio_send(data):
         return
 
     room = db.query(Chatroom).get(room_id)
-    user = db.query(User).get(user_id)
+    user = load_user(user_id)
     if not room or not user:
         emit("error", {"error": "Invalid chatroom or user"})
         return
-    if room.is_private and user not in room.participants:
+    if room.is_private and not Chatroom.has_participant(db, room_id, user_id, cached=True):
         emit("error", {"error": "Not a participant"})
         return
 
-    msg = Message(
+    fields = dict(
         chatroom_id=room_id,
         user_id=user_id,
         content=content,
@@ -207,7 +444,16 @@ def _sio_send(data):
         media_url=data.get("media_url"),
         created_at=datetime.utcnow(),
     )
+    if message_writer.enabled:
+        # group-committed; new_message goes out once the batch is durable
+        message_writer.submit(fields, request.sid)
+        return
+
+    msg = Message(**fields)
     db.add(msg)
     db.commit()
 
-    emit("new_message", {"message": msg.to_dict()}, room=str(room_id))
+    authors = {user.id: (user.username, user.profile_picture)}
+    payload = msg.to_dict(authors)
+    message_buffer.append(room_id, payload)
+    emit("new_message", {"message": payload}, room=str(room_id))
@@ -1,25 +1,97 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.database import get_db
 from app.models.event import Event
 from app.models.user  import User
+from app.utils.cache import invalidate_on_commit
+from app.utils.helpers import batch_distance
+from app.utils.http_cache import cached_response, response_cache
+from app.utils.identity import current_user_type
 from datetime import datetime
-import math
+from sqlalchemy import event as sa_event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import attributes, joinedload, object_session
 
 events_bp = Blueprint("events", __name__)
 
-# ---------------------------------------------------------------------------
-# Haversine helper
-# ---------------------------------------------------------------------------
-def _distance_km(lat1, lon1, lat2, lon2):
-    R = 6371.0
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(math.radians(lat1)) *
-         math.cos(math.radians(lat2)) *
-         math.sin(dlon / 2) ** 2)
-    return R * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+
+def _parse_datetime(value):
+    """ISO-8601 string (trailing 'Z' allowed) -> datetime. Raises ValueError."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _invalidate_event(db, event_id=None):
+    # every listing may include the event; the detail page only for its id
+    invalidate_on_commit(db, response_cache, "events")
+    if event_id is not None:
+        invalidate_on_commit(db, response_cache, f"event:{event_id}")
+
+
+@sa_event.listens_for(User, "after_update")
+def _business_renamed(mapper, connection, target):
+    # cached event bodies embed business_name
+    if target.user_type == "business" and attributes.get_history(target, "username").has_changes():
+        session = object_session(target)
+        invalidate_on_commit(session, response_cache, "events")
+        invalidate_on_commit(session, response_cache, "events:detail")
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _location_error(location):
+    """None if `location` is a usable location object, else the error message."""
+    if not isinstance(location, dict):
+        return "location must be an object"
+    coords = [location.get("latitude"), location.get("longitude")]
+    if coords == [None, None]:
+        return None
+    if not all(_is_number(c) for c in coords):
+        return "location latitude and longitude must be numbers"
+    if not (-90 <= coords[0] <= 90 and -180 <= coords[1] <= 180):
+        return "location latitude/longitude out of range"
+    return None
+
+
+def _build_event(data, business_id):
+    """
+    Validate one event payload (presence and types of every column it
+    sets). Returns (Event, None) or (None, error).
+    """
+    if not isinstance(data, dict) or not data.get("title") or not data.get("event_date"):
+        return None, "Title and event_date are required"
+    try:
+        event_dt = _parse_datetime(data["event_date"])
+    except (AttributeError, ValueError):
+        return None, "Invalid event date format"
+
+    if not isinstance(data["title"], str):
+        return None, "title must be a string"
+    if not isinstance(data.get("description", ""), (str, type(None))):
+        return None, "description must be a string"
+    if not isinstance(data.get("category"), (str, type(None))):
+        return None, "category must be a string"
+    if not isinstance(data.get("is_public", True), bool):
+        return None, "is_public must be a boolean"
+    max_attendees = data.get("max_attendees")
+    if max_attendees is not None and (
+            not isinstance(max_attendees, int) or isinstance(max_attendees, bool) or max_attendees < 1):
+        return None, "max_attendees must be a positive integer"
+    error = _location_error(data.get("location", {}))
+    if error:
+        return None, error
+
+    return Event(
+        title=data["title"],
+        description=data.get("description", ""),
+        business_id=business_id,
+        location=data.get("location", {}),
+        event_date=event_dt,
+        max_attendees=data.get("max_attendees"),
+        category=data.get("category"),
+        is_public=data.get("is_public", True),
+    ), None
 
 
 # ---------------------------------------------------------------------------
@@ -35,61 +107,109 @@ def create_event():
     if not data.get("title") or not data.get("event_date"):
         return jsonify(error="Title and event_date are required"), 400
 
-    user = db.query(User).get(user_id)
-    if user.user_type != "business":
+    if current_user_type() != "business":
         return jsonify(error="Only business accounts can create events"), 403
 
-    try:
-        event_dt = datetime.fromisoformat(data["event_date"].replace("Z", "+00:00"))
-    except ValueError:
-        return jsonify(error="Invalid event date format"), 400
+    event, error = _build_event(data, int(user_id))
+    if error:
+        return jsonify(error=error), 400
 
-    event = Event(
-        title=data["title"],
-        description=data.get("description", ""),
-        business_id=user_id,
-        location=data.get("location", {}),
-        event_date=event_dt,
-        max_attendees=data.get("max_attendees"),
-        category=data.get("category"),
-        is_public=data.get("is_public", True),
-    )
     db.add(event)
+    _invalidate_event(db)
     db.commit()
     return jsonify(message="Event created successfully", event=event.to_dict()), 201
 
 
 # ---------------------------------------------------------------------------
-# List events  (public; optional geo / category filters)
+# Bulk create events  (business accounts only; one transaction)
+# ---------------------------------------------------------------------------
+@events_bp.post("/bulk")
+@jwt_required()
+def create_events_bulk():
+    db = get_db()
+    user_id = int(get_jwt_identity())
+    items = (request.get_json() or {}).get("events")
+
+    if current_user_type() != "business":
+        return jsonify(error="Only business accounts can create events"), 403
+    if not isinstance(items, list) or not items:
+        return jsonify(error="events must be a non-empty list"), 400
+    if len(items) > current_app.config["BULK_MAX_ITEMS"]:
+        return jsonify(error=f"At most {current_app.config['BULK_MAX_ITEMS']} events per request"), 400
+
+    # validate everything before writing anything
+    built = [_build_event(item, user_id) for item in items]
+    events = [event for event, _ in built if event is not None]
+
+    if events:
+        try:
+            db.add_all(events)
+            db.flush()              # batched INSERT (insertmanyvalues)
+            ids = [e.id for e in events]
+            _invalidate_event(db)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            current_app.logger.exception("bulk event insert failed")
+            return jsonify(error="Events could not be saved"), 500
+        # refresh the whole batch in one query instead of once per event
+        db.query(Event).options(joinedload(Event.business)).filter(Event.id.in_(ids)).all()
+
+    results = [
+        dict(index=i, status=201, event=event.to_dict()) if event is not None
+        else dict(index=i, status=400, error=error)
+        for i, (event, error) in enumerate(built)
+    ]
+    status = 201 if len(events) == len(items) else 207 if events else 400
+    return jsonify(results=results, created=len(events)), status
+
+
+# ---------------------------------------------------------------------------
+# List events  (public; time window, optional geo / category filters)
 # ---------------------------------------------------------------------------
 @events_bp.get("/")
+@cached_response("events")
 def get_events():
     db = get_db()
     lat  = request.args.get("lat",  type=float)
     lng  = request.args.get("lng",  type=float)
     maxd = request.args.get("max_distance", 50, type=float)
     cat  = request.args.get("category")
+    limit  = min(max(request.args.get("limit", 50, type=int), 1), 200)
+    cursor = request.args.get("cursor")
 
-    query = db.query(Event).filter(Event.is_public.is_(True))
-    if cat:
-        query = query.filter(Event.category == cat)
+    # upcoming events only unless the caller asks for another window
+    try:
+        start = _parse_datetime(request.args["from"]) if "from" in request.args else datetime.utcnow()
+        end   = _parse_datetime(request.args["to"]) if "to" in request.args else None
+    except ValueError:
+        return jsonify(error="Invalid date format"), 400
 
-    events = query.all()
-    if lat and lng:
-        events = [
-            e for e in events
-            if e.location and
-               _distance_km(lat, lng,
-                            e.location.get("latitude", 0),
-                            e.location.get("longitude", 0)) <= maxd
-        ]
-    return jsonify(events=[e.to_dict() for e in events]), 200
+    try:
+        query = Event.window(db, start, end, category=cat, after=cursor)
+    except ValueError:
+        return jsonify(error="Invalid cursor"), 400
+    if lat is not None and lng is not None:
+        query = query.filter(Event.near(lat, lng, maxd))
+
+    events = query.limit(limit + 1).all()
+    next_cursor = events[limit - 1].cursor if len(events) > limit else None
+    events = events[:limit]
+
+    if lat is not None and lng is not None:
+        # exact radius check on the bounding-box candidates; keeps time order
+        hits = batch_distance(lat, lng,
+                              [e.latitude for e in events],
+                              [e.longitude for e in events], maxd)
+        events = [e for e, ok in zip(events, hits.within) if ok]
+    return jsonify(events=[e.to_dict() for e in events], next_cursor=next_cursor), 200
 
 
 # ---------------------------------------------------------------------------
 # Get single event
 # ---------------------------------------------------------------------------
 @events_bp.get("/<int:event_id>")
+@cached_response("events:detail", "event:{event_id}")
 def get_event(event_id):
     db = get_db()
     event = db.query(Event).get(event_id)
@@ -105,7 +225,7 @@ def get_event(event_id):
 @jwt_required()
 def update_event(event_id):
     db = get_db()
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     event = db.query(Event).get(event_id)
     if not event:
         return jsonify(error="Event not found"), 404
@@ -123,10 +243,11 @@ def update_event(event_id):
 
     if "event_date" in data:
         try:
-            event.event_date = datetime.fromisoformat(data["event_date"].replace("Z", "+00:00"))
+            event.event_date = _parse_datetime(data["event_date"])
         except ValueError:
             return jsonify(error="Invalid event date format"), 400
 
+    _invalidate_event(db, event_id)
     db.commit()
     return jsonify(message="Event updated", event=event.to_dict()), 200
 
@@ -138,7 +259,7 @@ def update_event(event_id):
 @jwt_required()
 def delete_event(event_id):
     db = get_db()
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     event = db.query(Event).get(event_id)
     if not event:
         return jsonify(error="Event not found"), 404
@@ -146,5 +267,6 @@ def delete_event(event_id):
         return jsonify(error="Not authorized"), 403
 
     db.delete(event)
+    _invalidate_event(db, event_id)
     db.commit()
     return jsonify(message="Event deleted"), 200
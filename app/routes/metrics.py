@@ -0,0 +1,32 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from app.extensions import db
+from app.models.chatroom import membership_cache
+from app.utils.decorators import admin_required
+from app.utils.http_cache import response_cache
+from app.utils.identity import identity_cache
+from app.utils.instrumentation import sql_metrics
+from app.utils.message_buffer import message_buffer
+from app.utils.message_writer import message_writer
+from app.utils.pool_metrics import pool_stats
+from app.utils.presence import presence
+
+metrics_bp = Blueprint("metrics", __name__)
+
+# ---------------------------------------------------------------------------
+# In-process cache / queue counters  (admin only, per worker)
+# ---------------------------------------------------------------------------
+@metrics_bp.get("/")
+@jwt_required()
+@admin_required
+def get_metrics():
+    return jsonify(
+        identity_cache=identity_cache.stats(),
+        response_cache=response_cache.stats(),
+        membership_cache=membership_cache.stats(),
+        message_writer=message_writer.stats(),
+        message_buffer=message_buffer.stats(),
+        presence=presence.stats(),
+        sql=sql_metrics.stats(),
+        db_pool=pool_stats(db.engine),
+    ), 200
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.database import get_db
 from app.models.user import User
+from app.utils.search import search_users as find_users
 
 users_bp = Blueprint("users", __name__)
 
@@ -13,21 +14,13 @@ users_bp = Blueprint("users", __name__)
 def search_users():
     db = get_db()
     query  = request.args.get("q", "")
-    limit  = request.args.get("limit", 10, type=int)
+    limit  = min(max(request.args.get("limit", 10, type=int), 1), 50)
 
-    if len(query) < 2:
+    if len(query.strip()) < 2:
         return jsonify(error="Search query must be at least 2 characters"), 400
 
-    users = (
-        db.query(User)
-        .filter(
-            (User.username.ilike(f"%{query}%"))
-            | (User.email.ilike(f"%{query}%"))
-        )
-        .filter(User.is_active.is_(True))
-        .limit(limit)
-        .all()
-    )
+    # exact, then prefix, then substring matches
+    users = find_users(db, query, limit)
     return jsonify(users=[u.to_dict() for u in users]), 200
 
 
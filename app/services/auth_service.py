@@ -1,7 +1,6 @@
 from app.models.user import User
 from app.database import get_db
 from app.utils.validators import validate_email, validate_password, validate_username
-import bcrypt
 
 class AuthService:
     @staticmethod
@@ -47,6 +46,9 @@ class AuthService:
             return None, "Invalid credentials"
         if not user.is_active:
             return None, "Account is deactivated"
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.commit()
             
         return user, "Login successful"
 
@@ -2,6 +2,7 @@ from app.models.chatroom import Chatroom, chatroom_participants
 from app.models.message import Message
 from app.models.user import User
 from app.database import get_db
+from app.utils.message_buffer import message_buffer
 from datetime import datetime
 
 class ChatService:
@@ -11,6 +12,10 @@ class ChatService:
         
         if not data.get("name"):
             return None, "Chatroom name is required"
+        max_participants = data.get("max_participants", 100)
+        if not isinstance(max_participants, int) or isinstance(max_participants, bool) \
+                or max_participants < 1:
+            return None, "max_participants must be a positive integer"
         
         room = Chatroom(
             name=data["name"],
@@ -18,15 +23,16 @@ class ChatService:
             business_id=data.get("business_id"),
             location=data.get("location", {}),
             is_private=data.get("is_private", False),
-            max_participants=data.get("max_participants", 100),
+            max_participants=max_participants,
             created_by=user_id,
         )
         db.add(room)
-        db.commit()
+        db.flush()
         
         # Add creator as participant
-        creator = db.query(User).get(user_id)
-        room.participants.append(creator)
+        if not Chatroom.add_participant(db, room.id, user_id):
+            db.rollback()
+            return None, "Could not seat the creator in the chatroom"
         db.commit()
         
         return room, "Chatroom created successfully"
@@ -39,18 +45,30 @@ class ChatService:
         if not room:
             return None, "Chatroom not found"
         
-        user = db.query(User).get(user_id)
-        if user in room.participants:
+        if Chatroom.has_participant(db, room_id, user_id):
             return room, "Already in chatroom"
         
-        if len(room.participants) >= room.max_participants:
+        if not Chatroom.add_participant(db, room_id, user_id):
+            db.rollback()
             return None, "Chatroom is full"
-        
-        room.participants.append(user)
         db.commit()
         
         return room, "Joined chatroom successfully"
 
+    @staticmethod
+    def leave_chatroom(user_id, room_id):
+        db = get_db()
+        
+        room = db.query(Chatroom).get(room_id)
+        if not room:
+            return None, "Chatroom not found"
+        
+        if not Chatroom.remove_participant(db, room_id, user_id):
+            return room, "Not in chatroom"
+        db.commit()
+        
+        return room, "Left chatroom successfully"
+
     @staticmethod
     def send_message(room_id, user_id, content, message_type="text", media_url=None):
         db = get_db()
@@ -61,7 +79,7 @@ class ChatService:
         if not room or not user:
             return None, "Invalid chatroom or user"
         
-        if room.is_private and user not in room.participants:
+        if room.is_private and not Chatroom.has_participant(db, room_id, user_id):
             return None, "Not a participant"
         
         message = Message(
@@ -74,28 +92,25 @@ class ChatService:
         )
         db.add(message)
         db.commit()
+        message_buffer.append(room_id, message.to_dict({user.id: (user.username, user.profile_picture)}))
         
         return message, "Message sent successfully"
 
     @staticmethod
-    def get_chatroom_messages(room_id, user_id, limit=50, offset=0):
+    def get_chatroom_messages(room_id, user_id, limit=50, offset=0, before=None, after=None):
         db = get_db()
         
         room = db.query(Chatroom).get(room_id)
-        user = db.query(User).get(user_id)
         
         if not room:
             return None, "Chatroom not found"
-        if room.is_private and user not in room.participants:
+        if room.is_private and not Chatroom.has_participant(db, room_id, user_id):
             return None, "Access denied"
         
-        messages = (
-            db.query(Message)
-            .filter(Message.chatroom_id == room_id)
-            .order_by(Message.created_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
-        )
+        try:
+            messages = Message.history(db, room_id, limit=limit, offset=offset,
+                                       before=before, after=after)
+        except ValueError:
+            return None, "Invalid cursor"
         
-        return list(reversed(messages)), "Messages retrieved successfully"
+        return messages, "Messages retrieved successfully"
@@ -10,7 +10,12 @@ from .validators import (validate_email,
                          validate_password,
                          validate_location,
                          validate_username)
-from .helpers    import calculate_distance, format_error_message
+from .helpers    import (calculate_distance,
+                         batch_distance,
+                         bounding_box,
+                         encode_cursor,
+                         decode_cursor,
+                         format_error_message)
 from .decorators import business_required, admin_required
 __all__ = [
     'validate_email',
@@ -18,6 +23,10 @@ __all__ = [
     'validate_location',
     'validate_username',
     'calculate_distance',
+    'batch_distance',
+    'bounding_box',
+    'encode_cursor',
+    'decode_cursor',
     'format_error_message',
     'business_required',
     'admin_required',
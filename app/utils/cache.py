@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU mapping whose entries also expire after `ttl`
+    seconds. Keeps hit/miss counters for the metrics endpoints.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()          # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def peek(self, key, default=None):
+        """Like get() but without the LRU bump or hit/miss accounting."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def __contains__(self, key):
+        # no LRU bump and no hit/miss accounting
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Commit-aware invalidation
+# ---------------------------------------------------------------------------
+def invalidate_on_commit(session, cache, key):
+    """
+    Drop `key` now and again once `session` commits, so a read racing the
+    transaction can't re-cache the old value for a whole TTL.
+    """
+    cache.pop(key)
+    session.info.setdefault("cache_invalidations", []).append((cache, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for cache, key in session.info.pop("cache_invalidations", ()):
+        cache.pop(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop("cache_invalidations", None)
@@ -1,8 +1,6 @@
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
-from app.database import get_db
-from app.models.user import User
+from app.utils.identity import current_user_type
 
 # ---------------------------------------------------------------------------
 # Decorator: Business account required
@@ -10,14 +8,11 @@ from app.models.user import User
 def business_required(fn):
     """
     Route decorator that allows only users with user_type == 'business'.
+    Goes under @jwt_required(); authorizes from the token's role claim.
     """
     @wraps(fn)
     def decorated(*args, **kwargs):
-        db       = get_db()
-        user_id  = get_jwt_identity()
-        user: User = db.query(User).get(user_id)
-
-        if not user or user.user_type != "business":
+        if current_user_type() != "business":
             return jsonify(error="Business account required"), 403
 
         return fn(*args, **kwargs)
@@ -31,14 +26,11 @@ def business_required(fn):
 def admin_required(fn):
     """
     Route decorator that allows only users with user_type == 'admin'.
+    Goes under @jwt_required(); authorizes from the token's role claim.
     """
     @wraps(fn)
     def decorated(*args, **kwargs):
-        db       = get_db()
-        user_id  = get_jwt_identity()
-        user: User = db.query(User).get(user_id)
-
-        if not user or user.user_type != "admin":
+        if current_user_type() != "admin":
             return jsonify(error="Admin access required"), 403
 
         return fn(*args, **kwargs)
@@ -0,0 +1,148 @@
+"""
+Socket.IO fan-out backends.
+
+`SOCKETIO_MESSAGE_QUEUE` picks how app processes share rooms:
+
+    unset                      single process, no fan-out
+    unix:///run/hubhive/sio    UnixSocketManager below, one host, no broker
+    redis://, amqp://, zmq+... handed to Flask-SocketIO's own managers
+"""
+import atexit
+import glob
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+import socket as _socket
+import stat
+from urllib.parse import urlparse
+
+import socketio
+
+log = logging.getLogger(__name__)
+
+# Linux caps a unix datagram at the socket send buffer (net.core.wmem_max)
+DATAGRAM_BUFFER = 4 * 1024 * 1024
+DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+class UnixSocketManager(socketio.PubSubManager):
+    """
+    Brokerless pub/sub between processes on one host.
+
+    Every process binds a datagram socket inside a shared directory and
+    publishing is a sendto() to every socket found there. Sockets whose
+    owner has died are removed on the first failed send.
+
+    The directory must be a 0700 directory owned by this user, and every
+    datagram carries an HMAC-SHA256 of its body keyed on `secret`
+    (SECRET_KEY); datagrams that fail the check are dropped before they
+    are unpickled.
+    """
+    name = "unix"
+
+    def __init__(self, url="unix:///tmp/hubhive-sio", secret=None, channel="flask-socketio",
+                 write_only=False, logger=None):
+        if not secret:
+            raise RuntimeError("the unix fan-out needs a SECRET_KEY to sign messages")
+        self.directory = urlparse(url).path
+        self._secret = secret.encode() if isinstance(secret, str) else secret
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self._check_directory()
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+
+        self.path = None
+        self._sock = None
+        self._green = _socket
+
+    def initialize(self):
+        if self.server is not None and self.server.async_mode == "eventlet":
+            # stay cooperative even when the stdlib hasn't been monkey-patched
+            from eventlet.green import socket as green_socket
+            self._green = green_socket
+        self._sock = self._open()
+        if not self.write_only:
+            self.path = os.path.join(
+                self.directory, f"{self.channel}-{os.getpid()}-{self.host_id[:8]}.sock")
+            self._sock.bind(self.path)
+            atexit.register(self._unlink, self.path)
+        super().initialize()
+
+    def _open(self):
+        sock = self._green.socket(_socket.AF_UNIX, _socket.SOCK_DGRAM)
+        for opt in (_socket.SO_SNDBUF, _socket.SO_RCVBUF):
+            try:
+                sock.setsockopt(_socket.SOL_SOCKET, opt, DATAGRAM_BUFFER)
+            except OSError:
+                pass
+        return sock
+
+    def _check_directory(self):
+        """Refuse a directory other local users could write to or plant sockets in."""
+        info = os.lstat(self.directory)
+        if not stat.S_ISDIR(info.st_mode):
+            raise RuntimeError(f"fan-out path {self.directory} is not a directory")
+        if info.st_uid != os.getuid():
+            raise RuntimeError(f"fan-out directory {self.directory} is owned by uid "
+                               f"{info.st_uid}, not {os.getuid()}")
+        if stat.S_IMODE(info.st_mode) != 0o700:
+            raise RuntimeError(f"fan-out directory {self.directory} has mode "
+                               f"{stat.S_IMODE(info.st_mode):o}, expected 700")
+
+    def _sign(self, body):
+        return hmac.new(self._secret, body, hashlib.sha256).digest() + body
+
+    def _verify(self, payload):
+        """The body of a signed datagram, or None if the signature is wrong."""
+        digest, body = payload[:DIGEST_SIZE], payload[DIGEST_SIZE:]
+        expected = hmac.new(self._secret, body, hashlib.sha256).digest()
+        return body if hmac.compare_digest(digest, expected) else None
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def peers(self):
+        pattern = os.path.join(self.directory, f"{self.channel}-*.sock")
+        return [p for p in glob.glob(pattern) if p != self.path]
+
+    def _publish(self, data):
+        if self._sock is None:
+            self._sock = self._open()
+        payload = self._sign(pickle.dumps({"channel": self.channel, "data": data}))
+        for peer in self.peers():
+            try:
+                self._sock.sendto(payload, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._unlink(peer)          # owner is gone
+            except OSError:
+                log.exception("fan-out to %s failed (%d bytes)", peer, len(payload))
+
+    def _listen(self):
+        while True:
+            body = self._verify(self._sock.recv(DATAGRAM_BUFFER))
+            if body is None:
+                log.warning("dropped an unsigned or forged fan-out datagram")
+                continue
+            try:
+                message = pickle.loads(body)
+            except Exception:
+                continue
+            if isinstance(message, dict) and message.get("channel") == self.channel:
+                yield message["data"]
+
+
+def fanout_options(config):
+    """
+    Extra SocketIO.init_app kwargs for the configured fan-out backend.
+    """
+    url = config.get("SOCKETIO_MESSAGE_QUEUE")
+    if not url:
+        return {}
+    if url.startswith("unix://"):
+        return {"client_manager": UnixSocketManager(url, secret=config.get("SECRET_KEY"))}
+    return {"message_queue": url}
@@ -1,23 +1,111 @@
+import base64
+import json
 import math
-from typing import Union
+from datetime import datetime
+from typing import NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180.0
 
 # ---------------------------------------------------------------------------
-# Geo helper
+# Geo helpers
 # ---------------------------------------------------------------------------
+class DistanceBatch(NamedTuple):
+    distances: np.ndarray   # km from the origin, NaN where coords are missing
+    within: np.ndarray      # bool mask, distances <= radius
+    order: np.ndarray       # indices of in-radius candidates, nearest first
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Haversine kernel on scalars or NumPy arrays (degrees in, km out).
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
 def calculate_distance(lat1: float, lon1: float,
                        lat2: float, lon2: float) -> float:
     """
     Great-circle distance between two lat/lon pairs (Haversine).
     Returns kilometres.
     """
-    # convert to radians
-    lon1, lat1, lon2, lat2 = map(math.radians, [lon1, lat1, lon2, lat2])
-    dlon, dlat = lon2 - lon1, lat2 - lat1
+    return float(_haversine_km(lat1, lon1, lat2, lon2))
+
+
+def batch_distance(lat: float, lon: float,
+                   lats: Sequence[Optional[float]],
+                   lons: Sequence[Optional[float]],
+                   radius_km: float = math.inf) -> DistanceBatch:
+    """
+    Distances from one origin to many candidates in a single vectorized pass.
+    `None` coordinates become NaN and never fall within the radius.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+
+    distances = _haversine_km(lat, lon, lats, lons)
+    within = distances <= radius_km
+    hits = np.flatnonzero(within)
+    order = hits[np.argsort(distances[hits], kind="stable")]
+    return DistanceBatch(distances, within, order)
+
+
+def bounding_box(lat: float, lon: float,
+                 radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Lat/lon box that fully contains the circle of `radius_km` around a point.
+    Returns (min_lat, max_lat, min_lon, max_lon).
+
+    When the box crosses the antimeridian min_lon > max_lon; near the poles
+    the longitude range widens to the full [-180, 180].
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+
+    # every meridian is within reach once the box touches a pole
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return min_lat, max_lat, -180.0, 180.0
 
-    a = (math.sin(dlat / 2) ** 2 +
-         math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2)
-    c = 2 * math.asin(math.sqrt(a))
-    return 6371.0 * c   # Earth radius in km
+    # widest longitude span is at the latitude furthest from the equator
+    widest = max(abs(min_lat), abs(max_lat))
+    dlon = radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(widest)))
+    if dlon >= 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180.0:
+        min_lon += 360.0
+    if max_lon > 180.0:
+        max_lon -= 360.0
+    return min_lat, max_lat, min_lon, max_lon
+
+
+# ---------------------------------------------------------------------------
+# Keyset pagination cursors
+# ---------------------------------------------------------------------------
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    """
+    Opaque, URL-safe cursor for a (timestamp, id) sort key.
+    """
+    raw = json.dumps([ts.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Inverse of encode_cursor. Raises ValueError on anything malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(ts), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,143 @@
+"""
+Tagged response cache for public, read-heavy GET endpoints.
+
+`@cached_response("events", "event:{event_id}")` stores the rendered
+body of a 200 response keyed on path + query string, labelled with the
+given tags (formatted from the view's URL arguments). Hits are answered
+without running the view: same body, or 304 when `If-None-Match` carries
+the current ETag. Writers drop everything under a tag with
+`invalidate_on_commit(session, response_cache, tag)`.
+
+The cache is per process; HTTP_CACHE_TTL bounds how long another
+worker can keep serving an entry that was invalidated elsewhere.
+"""
+import hashlib
+import threading
+from functools import wraps
+from typing import NamedTuple
+
+from flask import current_app, make_response, request
+
+from app.utils.cache import TTLCache
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    mimetype: str
+    etag: str
+
+
+class ResponseCache:
+    def __init__(self, maxsize=2048, ttl=60.0, max_age=30):
+        self.enabled = True
+        self.max_age = max_age
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._tags = {}             # tag -> set of keys
+        self._keys = {}             # key -> set of tags (reverse of _tags)
+        self._generation = 0        # bumped on every invalidation
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get("HTTP_CACHE_ENABLED", True)
+        self.max_age = app.config.get("HTTP_CACHE_MAX_AGE", self.max_age)
+        self._entries.maxsize = app.config.get("HTTP_CACHE_SIZE", self._entries.maxsize)
+        self._entries.ttl = app.config.get("HTTP_CACHE_TTL", self._entries.ttl)
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def store(self, key, response, tags, generation):
+        """
+        Cache a rendered 200 response under `tags`. Skipped when anything
+        was invalidated since `generation`, so a render that raced a write
+        never outlives it.
+        """
+        body = response.get_data()
+        entry = CachedBody(body, response.mimetype, hashlib.sha1(body).hexdigest())
+        with self._lock:
+            if generation != self._generation:
+                return entry
+            self._entries.set(key, entry)
+            self._keys.setdefault(key, set()).update(tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            if len(self._keys) > 2 * self._entries.maxsize:
+                self._sweep()
+        return entry
+
+    def _sweep(self):
+        """Forget keys the LRU evicted or that expired, and tags left empty."""
+        # caller holds the lock; amortised O(1) per store() as it runs only
+        # once the tracked keys reach twice the cache size
+        for key in [k for k in self._keys if k not in self._entries]:
+            self._forget(key)
+
+    def _forget(self, key):
+        for tag in self._keys.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def pop(self, tag, default=None):
+        """Drop every entry labelled `tag` (the invalidate_on_commit interface)."""
+        with self._lock:
+            self._generation += 1
+            for key in list(self._tags.get(tag, ())):
+                self._entries.pop(key)
+                self._forget(key)
+        return default
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._tags.clear()
+            self._keys.clear()
+            self._entries.clear()
+
+    def respond(self, entry):
+        response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+        response.set_etag(entry.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response.make_conditional(request)
+
+    def stats(self) -> dict:
+        return {**self._entries.stats(), "enabled": self.enabled,
+                "tags": len(self._tags), "max_age": self.max_age}
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(*tags):
+    """
+    Serve a GET view from response_cache. Only 200 responses are stored;
+    `tags` may use the view's URL arguments, e.g. "event:{event_id}".
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not response_cache.enabled:
+                return fn(*args, **kwargs)
+
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            entry = response_cache.get(key)
+            if entry is None:
+                generation = response_cache.generation
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = response_cache.store(
+                    key, response, [t.format(**kwargs) for t in tags], generation
+                )
+            return response_cache.respond(entry)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,138 @@
+"""
+Cached identity for JWT-protected routes.
+
+`current_user` (from flask_jwt_extended) resolves through `load_user`,
+which keeps small read-only snapshots of users in a bounded LRU+TTL
+cache. Authenticated reads therefore skip the per-request primary-key
+SELECT; anything that changes a User row drops its snapshot on commit.
+
+Access tokens carry `user_type` and the account's `token_version` as
+claims. Role checks read the claim; the blocklist hook compares `ver`
+against the cached snapshot, so a demotion or deactivation (which bumps
+`token_version`) revokes outstanding tokens without a per-request SELECT.
+
+Snapshots are dropped only in the process that made the change, so with
+SOCKETIO_MESSAGE_QUEUE set (several workers) the TTL is cut to
+IDENTITY_CACHE_SHARED_TTL seconds, which bounds how long another worker
+keeps honouring a revoked token or showing a stale profile.
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from flask_jwt_extended import create_access_token, decode_token, get_jwt
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+
+from app.extensions import db, jwt
+from app.models.user import User
+from app.utils.cache import TTLCache, invalidate_on_commit
+
+identity_cache = TTLCache(maxsize=10_000, ttl=300.0)
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    id: int
+    email: str
+    username: str
+    user_type: str
+    is_active: bool
+    profile_picture: str | None
+    token_version: int
+    profile: dict          # User.to_dict() at load time
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            user_type=user.user_type,
+            is_active=user.is_active,
+            profile_picture=user.profile_picture,
+            token_version=user.token_version or 0,
+            profile=user.to_dict(),
+        )
+
+
+def init_identity(app):
+    identity_cache.maxsize = app.config.get("IDENTITY_CACHE_SIZE", identity_cache.maxsize)
+    ttl = app.config.get("IDENTITY_CACHE_TTL", identity_cache.ttl)
+    if app.config.get("SOCKETIO_MESSAGE_QUEUE"):
+        ttl = min(ttl, app.config.get("IDENTITY_CACHE_SHARED_TTL", 5))
+    identity_cache.ttl = ttl
+
+
+def load_user(user_id) -> UserSnapshot | None:
+    try:
+        key = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    snapshot = identity_cache.get(key)
+    if snapshot is None:
+        user = db.session.get(User, key)
+        if user is None:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+        identity_cache.set(key, snapshot)
+    return snapshot
+
+
+def issue_access_token(user: User) -> str:
+    return create_access_token(
+        identity=str(user.id),
+        additional_claims={
+            "user_type": user.user_type,
+            "ver": user.token_version or 0,
+        },
+    )
+
+
+def current_user_type() -> str | None:
+    """Role of the authenticated caller, from the token when it has one."""
+    user_type = get_jwt().get("user_type")
+    if user_type is None:
+        # token issued before role claims existed
+        snapshot = load_user(get_jwt()["sub"])
+        user_type = snapshot.user_type if snapshot else None
+    return user_type
+
+
+@jwt.token_in_blocklist_loader
+def _token_revoked(_jwt_header, jwt_data):
+    snapshot = load_user(jwt_data["sub"])
+    if snapshot is None or not snapshot.is_active:
+        return True
+    return jwt_data.get("ver", 0) != snapshot.token_version
+
+
+@jwt.user_lookup_loader
+def _lookup_user(_jwt_header, jwt_data):
+    return load_user(jwt_data["sub"])
+
+
+def identity_from_token(token):
+    """
+    User id of an encoded access token, or None if it is malformed,
+    expired, not an access token or revoked. For code outside
+    @jwt_required, such as the Socket.IO connect handler.
+    """
+    if not isinstance(token, str):
+        return None
+    try:
+        jwt_data = decode_token(token)
+    except (JWTExtendedException, PyJWTError):
+        return None
+    if jwt_data.get("type") != "access" or _token_revoked(None, jwt_data):
+        return None
+    return int(jwt_data["sub"])
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    # profile edits, deactivation, role changes, password rehash ...
+    invalidate_on_commit(object_session(target), identity_cache, target.id)
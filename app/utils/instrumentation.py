@@ -0,0 +1,209 @@
+"""
+Per-request / per-Socket.IO-event SQL instrumentation.
+
+Engine events time every statement and charge it to the unit of work in
+progress (an HTTP request, or a socket handler wrapped with
+`@instrumented`). For each unit we keep the query count, total DB time
+and how often each statement shape repeated; a shape seen
+SQL_N_PLUS_ONE_THRESHOLD times or more is reported as a likely N+1.
+
+- debug (or SQL_DEBUG_HEADERS): X-DB-Query-Count / X-DB-Time-Ms /
+  X-DB-Repeated headers on every response
+- always: per-endpoint totals for /api/metrics, and a warning log line
+  for units that look like N+1 or exceed SQL_SLOW_MS
+
+`assert_max_queries` is the test-side helper.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+
+# "IN (?, ?, ?)" / "IN (%(p_1)s, ...)" -> one shape whatever the list length
+_IN_LIST = re.compile(r"\(\s*(?:\?|%\([^)]*\)s|:\w+)(?:\s*,\s*(?:\?|%\([^)]*\)s|:\w+))+\s*\)")
+
+
+def statement_shape(statement):
+    return _IN_LIST.sub("(...)", " ".join(statement.split()))
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    @property
+    def time_ms(self):
+        return self.seconds * 1000
+
+    def repeated(self, threshold):
+        """[(shape, times)] for shapes run at least `threshold` times."""
+        return [(s, n) for s, n in self.shapes.most_common() if n >= threshold]
+
+
+# -- engine hooks -------------------------------------------------------------
+_watchers = []                  # QueryStats collecting for assert_max_queries
+_watchers_lock = threading.Lock()
+
+
+def _current_stats():
+    return g.get("_sql_stats") if has_app_context() else None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_sql_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("_sql_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    stats = _current_stats()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for watcher in _watchers:
+        watcher.record(statement, elapsed)
+
+
+# -- aggregation / reporting ----------------------------------------------------
+class SQLMetrics:
+    """Per-endpoint totals since start-up (per process)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def add(self, name, stats, flagged):
+        with self._lock:
+            row = self._endpoints.setdefault(
+                name, {"calls": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0, "n_plus_one": 0}
+            )
+            row["calls"] += 1
+            row["queries"] += stats.count
+            row["db_ms"] += stats.time_ms
+            row["max_queries"] = max(row["max_queries"], stats.count)
+            row["n_plus_one"] += bool(flagged)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: {**row, "db_ms": round(row["db_ms"], 2),
+                       "avg_queries": round(row["queries"] / row["calls"], 2)}
+                for name, row in sorted(self._endpoints.items())
+            }
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+sql_metrics = SQLMetrics()
+
+
+def _finish(name, stats):
+    config = current_app.config
+    repeated = stats.repeated(config.get("SQL_N_PLUS_ONE_THRESHOLD", 5))
+    sql_metrics.add(name, stats, repeated)
+    if repeated or stats.time_ms >= config.get("SQL_SLOW_MS", 500):
+        log.warning(
+            "sql %s queries=%d db_ms=%.1f repeated=%s",
+            name, stats.count, stats.time_ms,
+            "; ".join(f"{n}x {shape[:120]}" for shape, n in repeated[:3]) or "-",
+        )
+    return repeated
+
+
+# -- Flask ----------------------------------------------------------------------
+def init_instrumentation(app):
+    if not app.config.get("SQL_INSTRUMENTATION", True):
+        return
+
+    @app.before_request
+    def _start_request_stats():
+        g._sql_stats = QueryStats()
+
+    @app.after_request
+    def _query_headers(response):
+        stats = g.get("_sql_stats")
+        headers = app.config.get("SQL_DEBUG_HEADERS")
+        if stats is not None and (app.debug if headers is None else headers):
+            # streamed bodies run their queries after this point
+            threshold = app.config.get("SQL_N_PLUS_ONE_THRESHOLD", 5)
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Time-Ms"] = f"{stats.time_ms:.2f}"
+            response.headers["X-DB-Repeated"] = str(len(stats.repeated(threshold)))
+        return response
+
+    @app.teardown_request
+    def _report_request_stats(exc):
+        stats = g.pop("_sql_stats", None)
+        if stats is not None:
+            _finish(f"{request.method} {request.url_rule or request.path}", stats)
+
+
+def instrumented(name):
+    """
+    Account a Socket.IO handler's queries like a request. Goes under
+    @socketio.on(...).
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("SQL_INSTRUMENTATION", True):
+                return fn(*args, **kwargs)
+            outer = g.get("_sql_stats")
+            g._sql_stats = stats = QueryStats()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                g._sql_stats = outer
+                _finish(f"socket {name}", stats)
+
+        return wrapper
+
+    return decorator
+
+
+# -- tests ------------------------------------------------------------------------
+@contextmanager
+def assert_max_queries(limit):
+    """
+    Fail if the block runs more than `limit` statements, e.g.
+
+        with assert_max_queries(4):
+            client.get("/api/chat/rooms/1/messages", headers=auth)
+
+    Yields the QueryStats so callers can inspect counts and shapes.
+    """
+    stats = QueryStats()
+    with _watchers_lock:
+        _watchers.append(stats)
+    try:
+        yield stats
+    finally:
+        with _watchers_lock:
+            _watchers.remove(stats)
+    if stats.count > limit:
+        shapes = "\n".join(f"  {n}x {shape}" for shape, n in stats.shapes.most_common())
+        raise AssertionError(f"{stats.count} queries, expected at most {limit}:\n{shapes}")
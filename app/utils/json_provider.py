@@ -0,0 +1,116 @@
+"""
+JSON encoding for HTTP responses and Socket.IO packets.
+
+Uses orjson when it is installed and the stdlib encoder otherwise; both
+write datetimes / dates as ISO-8601 strings, so models hand them over
+as-is. The module itself doubles as the `json=` implementation given to
+Socket.IO (it only needs `dumps` / `loads`).
+
+`stream_json_list` writes large list responses incrementally.
+"""
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+
+from flask import current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_ORJSON_OPTS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def _default(o):
+    """Types neither encoder handles natively (stdlib: datetimes too)."""
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "tolist"):            # NumPy scalars / arrays
+        return o.tolist()
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps(obj, **kwargs) -> str:
+    """
+    Serialize to a str. Formatting kwargs (separators, indent, ...) from
+    callers such as python-socketio are ignored on the orjson path,
+    whose output is always compact.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS).decode()
+    kwargs.setdefault("default", _default)
+    kwargs.setdefault("separators", (",", ":"))
+    return json.dumps(obj, **kwargs)
+
+
+def loads(s, **kwargs):
+    if orjson is not None and not kwargs:
+        return orjson.loads(s)
+    return json.loads(s, **kwargs)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson (stdlib fallback). Keys are not
+    sorted; debug mode still pretty-prints.
+    """
+
+    default = staticmethod(_default)
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        if orjson is None or pretty:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=_ORJSON_OPTS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def _encode(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def stream_json_list(key, query, serialize=None, batch_size=500):
+    """
+    Chunked `{"<key>": [...]}` response for a list endpoint of unbounded
+    size. Rows are read with yield_per(batch_size) and written one batch
+    per chunk, so memory stays flat however many rows match.
+    Errors after the first chunk can no longer change the status code.
+    """
+    serialize = serialize or (lambda row: row.to_dict())
+
+    def generate():
+        yield b"{" + _encode(key) + b":["
+        sep, chunk = b"", []
+        for row in query.yield_per(batch_size):
+            chunk.append(_encode(serialize(row)))
+            if len(chunk) >= batch_size:
+                yield sep + b",".join(chunk)
+                sep, chunk = b",", []
+        if chunk:
+            yield sep + b",".join(chunk)
+        yield b"]}\n"
+
+    return current_app.response_class(stream_with_context(generate()),
+                                      mimetype="application/json")
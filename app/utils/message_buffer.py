@@ -0,0 +1,135 @@
+"""
+Recent-history ring buffer for chat rooms.
+
+Most history reads are the newest page of a room (no cursor, offset 0).
+`message_buffer` keeps the last MESSAGE_BUFFER_SIZE serialized messages
+of recently read rooms so that page is served without touching the DB:
+
+- a room is warmed by the first newest-page read that misses
+- the send paths (`send_message` socket handler, write-behind flush,
+  ChatService.send_message) append to rooms that are already warm
+- at most MESSAGE_BUFFER_ROOMS rooms are kept, least recently read
+  evicted first; a room is re-read from the DB MESSAGE_BUFFER_TTL seconds
+  after it was warmed
+- only sends handled by this process are appended, so with
+  SOCKETIO_MESSAGE_QUEUE set (several workers) the TTL is cut to
+  MESSAGE_BUFFER_SHARED_TTL seconds, which bounds how long another
+  worker's messages can be missing from the newest page
+- a warm-up that raced an append to the same room is not installed
+  (per-room generation counters, as in ResponseCache.store)
+"""
+import threading
+from collections import deque
+
+from app.utils.cache import TTLCache
+
+
+class _Ring:
+    __slots__ = ("messages", "complete")
+
+    def __init__(self, messages, capacity):
+        self.messages = deque(messages, maxlen=capacity)
+        # fewer rows than capacity came back: this is the whole history
+        self.complete = len(self.messages) < capacity
+
+
+def _key(message):
+    return message["created_at"], message["id"]
+
+
+class MessageBuffer:
+    # generation counters are striped by room id so they take fixed space;
+    # two rooms sharing a stripe only costs the odd skipped warm-up
+    STRIPES = 4096
+
+    def __init__(self):
+        self.enabled = True
+        self.capacity = 100
+        self._rooms = TTLCache(maxsize=1000, ttl=300.0)
+        self._generations = [0] * self.STRIPES
+        self._lock = threading.Lock()
+        self.appends = 0
+        self.dropped = 0
+        self.stale_warms = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get("MESSAGE_BUFFER_ENABLED", True)
+        self.capacity = app.config.get("MESSAGE_BUFFER_SIZE", self.capacity)
+        ttl = app.config.get("MESSAGE_BUFFER_TTL", 300)
+        if app.config.get("SOCKETIO_MESSAGE_QUEUE"):
+            ttl = min(ttl, app.config.get("MESSAGE_BUFFER_SHARED_TTL", 2))
+        self._rooms = TTLCache(maxsize=app.config.get("MESSAGE_BUFFER_ROOMS", 1000), ttl=ttl)
+
+    def generation(self, room_id):
+        """Read before loading a room from the DB; hand it to warm()."""
+        return self._generations[int(room_id) % self.STRIPES]
+
+    def latest(self, room_id, limit):
+        """
+        The newest `limit` messages of a room, oldest first, or None if the
+        buffer can't answer (cold room, or a page larger than it holds).
+        """
+        if not self.enabled or limit > self.capacity:
+            return None
+        ring = self._rooms.get(int(room_id))
+        if ring is None:
+            return None
+        with self._lock:
+            if len(ring.messages) < limit and not ring.complete:
+                return None
+            return list(ring.messages)[-limit:] if limit > 0 else []
+
+    def warm(self, room_id, messages, generation):
+        """
+        Seed a room with its newest `capacity` messages (oldest first).
+        Skipped if a message was appended to the room since `generation`,
+        as the DB read may not include it.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self.generation(room_id):
+                self.stale_warms += 1
+                return
+            self._rooms.set(int(room_id), _Ring(messages, self.capacity))
+
+    def append(self, room_id, message):
+        """Add a just-committed message to the room's buffer, if it has one."""
+        with self._lock:
+            # cold or not: a warm-up reading the DB right now may miss this one
+            self._generations[int(room_id) % self.STRIPES] += 1
+            ring = self._rooms.peek(int(room_id))
+            if ring is None:
+                return
+            if ring.messages and _key(message) <= _key(ring.messages[-1]):
+                # arrived out of order; let the next read re-warm the room
+                self._rooms.pop(int(room_id))
+                self.dropped += 1
+                return
+            if len(ring.messages) == self.capacity:
+                ring.complete = False
+            ring.messages.append(message)
+            self.appends += 1
+
+    def pop(self, room_id):
+        with self._lock:
+            self._generations[int(room_id) % self.STRIPES] += 1
+            self._rooms.pop(int(room_id))
+
+    def clear(self):
+        with self._lock:
+            self._generations = [g + 1 for g in self._generations]
+            self._rooms.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self._rooms.stats(),
+            "enabled": self.enabled,
+            "capacity": self.capacity,
+            "appends": self.appends,
+            "dropped": self.dropped,
+            "stale_warms": self.stale_warms,
+        }
+
+
+message_buffer = MessageBuffer()
@@ -0,0 +1,145 @@
+"""
+Write-behind queue for Socket.IO chat messages.
+
+With CHAT_WRITE_BEHIND on, `send_message` hands validated messages to
+`message_writer` instead of committing them itself. A background task
+drains the queue in batches: everything that arrives within
+CHAT_WRITE_FLUSH_MS (or up to CHAT_WRITE_BATCH_SIZE messages, from any
+room) goes out as one bulk INSERT and a single commit, and `new_message`
+is broadcast only after that commit returns.
+"""
+import atexit
+import logging
+import time
+
+from app.extensions import db, socketio
+from app.utils.message_buffer import message_buffer
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MessageWriter:
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.batch_size = 200
+        self.flush_interval = 0.02
+        self.batches = 0
+        self.written = 0
+        self._queue = None
+        self._task = None
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("CHAT_WRITE_BEHIND", False)
+        self.batch_size = app.config.get("CHAT_WRITE_BATCH_SIZE", self.batch_size)
+        self.flush_interval = app.config.get("CHAT_WRITE_FLUSH_MS", 20) / 1000.0
+        if self.enabled:
+            atexit.register(self.stop)
+
+    # -- producer side ------------------------------------------------------
+    def submit(self, fields, sid=None):
+        """
+        Queue one message (Message column values) for the next group commit.
+        `sid` is told about it if the batch fails.
+        """
+        if self._task is None:
+            self._start()
+        self._queue.put((fields, sid))
+
+    def stop(self):
+        """
+        Flush everything already queued, then stop the background task.
+        """
+        if self._task is None:
+            return
+        self._queue.put(_STOP)
+        # wait on an event rather than task.join(): engineio's eventlet
+        # join() returns at once for a green thread that hasn't run yet
+        self._done.wait()
+        self._task = None
+
+    # -- consumer side ------------------------------------------------------
+    def _start(self):
+        eio = socketio.server.eio
+        self._queue = eio.create_queue()
+        self._empty = eio.get_queue_empty_exception()
+        self._done = eio.create_event()
+        self._task = socketio.start_background_task(self._run)
+
+    def _run(self):
+        stopping = False
+        try:
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+
+                batch = [item]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except self._empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                try:
+                    self._flush(batch)
+                except Exception:
+                    log.exception("write-behind batch of %d messages dropped", len(batch))
+        finally:
+            self._done.set()
+
+    def _flush(self, batch):
+        from app.models.message import Message
+
+        table = Message.__table__
+        with self.app.app_context():
+            try:
+                # one multi-row INSERT ... RETURNING; the returned rows carry
+                # ids and server defaults, so nothing is re-read for the payloads.
+                # (Asking for parameter order makes SQLite insert row by row.)
+                rows = db.session.execute(
+                    table.insert().returning(*table.c),
+                    [fields for fields, _ in batch],
+                ).all()
+                db.session.commit()
+            except Exception:
+                log.exception("write-behind flush of %d messages failed", len(batch))
+                db.session.rollback()
+                for _, sid in batch:
+                    if sid:
+                        socketio.emit("error", {"error": "Message could not be saved"}, to=sid)
+                return
+
+            # transient instances, only used to serialize
+            msgs = [Message(**row._mapping) for row in sorted(rows, key=lambda r: r.id)]
+            self.batches += 1
+            self.written += len(msgs)
+            authors = Message.author_map(db.session, msgs)
+            for msg in msgs:
+                payload = msg.to_dict(authors)
+                message_buffer.append(msg.chatroom_id, payload)
+                socketio.emit("new_message", {"message": payload}, to=str(msg.chatroom_id))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": self.flush_interval * 1000.0,
+            "batches": self.batches,
+            "written": self.written,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+message_writer = MessageWriter()
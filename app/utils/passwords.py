@@ -0,0 +1,67 @@
+"""
+bcrypt hashing off the request path.
+
+bcrypt is deliberately slow (~250 ms at cost 12). Under eventlet a direct
+call freezes every green thread on the worker for that long, so hashing
+and verification run in a bounded pool of native threads instead:
+eventlet's tpool when the stdlib is monkey-patched, a ThreadPoolExecutor
+otherwise. bcrypt releases the GIL while it works.
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from flask import current_app, has_app_context
+
+DEFAULT_ROUNDS  = 12
+DEFAULT_THREADS = 4
+
+_executor = None
+_tpool_ready = False
+
+
+def _config(key, default):
+    return current_app.config.get(key, default) if has_app_context() else default
+
+
+def _green():
+    eventlet = sys.modules.get("eventlet")
+    return eventlet is not None and eventlet.patcher.is_monkey_patched("thread")
+
+
+def _offload(fn, *args):
+    global _executor, _tpool_ready
+    threads = _config("BCRYPT_THREADS", DEFAULT_THREADS)
+
+    if _green():
+        from eventlet import tpool
+        if not _tpool_ready:
+            tpool.set_num_threads(threads)
+            _tpool_ready = True
+        return tpool.execute(fn, *args)
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=threads,
+                                       thread_name_prefix="bcrypt")
+    return _executor.submit(fn, *args).result()
+
+
+def hash_password(raw: str, rounds: int | None = None) -> str:
+    rounds = rounds or _config("BCRYPT_LOG_ROUNDS", DEFAULT_ROUNDS)
+    salt = bcrypt.gensalt(rounds)
+    return _offload(bcrypt.hashpw, raw.encode(), salt).decode()
+
+
+def verify_password(raw: str, hashed: str) -> bool:
+    return _offload(bcrypt.checkpw, raw.encode(), hashed.encode())
+
+
+def needs_rehash(hashed: str, rounds: int | None = None) -> bool:
+    """
+    True when `hashed` was made with a different cost than configured.
+    """
+    rounds = rounds or _config("BCRYPT_LOG_ROUNDS", DEFAULT_ROUNDS)
+    try:
+        return int(hashed.split("$")[2]) != rounds
+    except (IndexError, ValueError):
+        return True
@@ -0,0 +1,169 @@
+"""
+Connection-pool instrumentation.
+
+`init_pool_metrics(app)` (called before `db.init_app`) makes the engine
+use InstrumentedQueuePool, which times how long each checkout waited
+for a connection. Pool events track how long connections are held and
+how long they live. Live gauges (checked out, overflow) come straight
+from the pool in `pool_stats()`.
+
+A checkout slower than DB_POOL_WAIT_WARN_MS, or one that finds every
+connection in use (size + max_overflow), logs a warning; at most one
+per DB_POOL_ALERT_INTERVAL seconds.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+log = logging.getLogger(__name__)
+
+
+def _summary(samples):
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+
+    def pick(pct):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000, 3)
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "max_ms": round(ordered[-1] * 1000, 3)}
+
+
+class PoolMetrics:
+    def __init__(self, window=1000):
+        self.wait_warn = 0.1
+        self.alert_interval = 10.0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.saturated = 0
+        self.connects = 0
+        self.closes = 0
+        self._waits = deque(maxlen=window)       # seconds, most recent checkouts
+        self._holds = deque(maxlen=window)       # seconds a connection stayed checked out
+        self._lifetimes = deque(maxlen=window)   # seconds from connect to close
+        self._last_alert = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.wait_warn = app.config.get("DB_POOL_WAIT_WARN_MS", 100) / 1000.0
+        self.alert_interval = app.config.get("DB_POOL_ALERT_INTERVAL", self.alert_interval)
+
+    def record_wait(self, pool, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self._waits.append(seconds)
+            slow = seconds >= self.wait_warn
+            self.slow_checkouts += slow
+            # every pooled connection and every overflow slot in use
+            full = (pool._max_overflow >= 0
+                    and pool.overflow() >= pool._max_overflow
+                    and pool.checkedin() == 0)
+            self.saturated += full
+        if slow or full:
+            self._alert(pool, seconds, full)
+
+    def _alert(self, pool, seconds, full):
+        now = time.monotonic()
+        if now - self._last_alert < self.alert_interval:
+            return
+        self._last_alert = now
+        log.warning(
+            "db pool %s: checkout waited %.1f ms (checked_out=%d size=%d overflow=%d/%d)",
+            "saturated" if full else "slow", seconds * 1000, pool.checkedout(),
+            pool.size(), pool.overflow(), pool._max_overflow,
+        )
+
+    def clear(self):
+        with self._lock:
+            self.checkouts = self.timeouts = self.slow_checkouts = self.saturated = 0
+            self.connects = self.closes = 0
+            self._waits.clear()
+            self._holds.clear()
+            self._lifetimes.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "saturated_checkouts": self.saturated,
+                "connects": self.connects,
+                "closes": self.closes,
+                "checkout_wait": _summary(self._waits),
+                "held": _summary(self._holds),
+                "lifetime": _summary(self._lifetimes),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times checkouts (queue wait, plus connect on overflow)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.record_wait(self, time.perf_counter() - start)
+
+
+@event.listens_for(InstrumentedQueuePool, "connect")
+def _on_connect(dbapi_connection, record):
+    record.info["connected_at"] = time.monotonic()
+    pool_metrics.connects += 1
+
+
+@event.listens_for(InstrumentedQueuePool, "checkout")
+def _on_checkout(dbapi_connection, record, proxy):
+    record.info["checked_out_at"] = time.monotonic()
+
+
+@event.listens_for(InstrumentedQueuePool, "checkin")
+def _on_checkin(dbapi_connection, record):
+    started = record.info.pop("checked_out_at", None)
+    if started is not None:
+        pool_metrics._holds.append(time.monotonic() - started)
+
+
+@event.listens_for(InstrumentedQueuePool, "close")
+def _on_close(dbapi_connection, record):
+    connected = record.info.pop("connected_at", None)
+    pool_metrics.closes += 1
+    if connected is not None:
+        pool_metrics._lifetimes.append(time.monotonic() - connected)
+
+
+def init_pool_metrics(app):
+    """Must run before db.init_app so the engine is built with the pool class."""
+    pool_metrics.init_app(app)
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI", "")
+    if uri in ("sqlite://", "sqlite:///:memory:"):
+        return      # in-memory SQLite keeps its single-connection pool
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    options.setdefault("poolclass", InstrumentedQueuePool)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    gauges = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        gauges.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    return {**gauges, **pool_metrics.stats()}
@@ -0,0 +1,140 @@
+"""
+In-memory room presence for Socket.IO.
+
+`presence` tracks which sockets sit in which chatroom, keyed by user so
+a user with two tabs open counts once. Membership changes mark the room
+dirty; a background task coalesces everything that happens within
+PRESENCE_DEBOUNCE_MS into one `presence_update` per room, so a burst of
+joins (or a reconnect storm) costs one broadcast instead of one per
+socket.
+
+`online_count()` is a dict lookup and is safe to call from to_dict().
+State is per process: with several workers each one reports the sockets
+connected to it.
+"""
+import threading
+
+from app.extensions import socketio
+
+
+class Presence:
+    def __init__(self):
+        self.debounce = 0.25
+        self._rooms = {}        # room_id -> {user key -> {sid, ...}}
+        self._sessions = {}     # sid -> (user key, {room_id, ...})
+        self._dirty = set()
+        self._flush_pending = False
+        self._lock = threading.Lock()
+        self.updates = 0        # presence_update events emitted
+        self.changes = 0        # membership changes folded into them
+
+    def init_app(self, app):
+        self.debounce = app.config.get("PRESENCE_DEBOUNCE_MS", 250) / 1000.0
+
+    # -- socket lifecycle -------------------------------------------------------
+    def join(self, sid, room_id, user_id=None):
+        """
+        Record `sid` in `room_id`. `user_id` must come from the socket's
+        authenticated session, never from the event payload; anonymous
+        sockets count as a user of their own.
+        """
+        room_id = int(room_id)
+        with self._lock:
+            key, rooms = self._sessions.setdefault(
+                sid, (int(user_id) if user_id is not None else sid, set()))
+            rooms.add(room_id)
+            users = self._rooms.setdefault(room_id, {})
+            sids = users.setdefault(key, set())
+            if sid in sids:
+                return
+            sids.add(sid)
+            if len(sids) == 1:
+                self._mark(room_id)
+
+    def leave(self, sid, room_id):
+        room_id = int(room_id)
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None or room_id not in session[1]:
+                return
+            session[1].discard(room_id)
+            self._drop(sid, session[0], room_id)
+            if not session[1]:
+                del self._sessions[sid]
+
+    def disconnect(self, sid):
+        """Forget `sid` everywhere; returns the rooms it was in."""
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+            if session is None:
+                return set()
+            key, rooms = session
+            for room_id in rooms:
+                self._drop(sid, key, room_id)
+            return rooms
+
+    def _drop(self, sid, key, room_id):
+        users = self._rooms.get(room_id, {})
+        sids = users.get(key)
+        if not sids:
+            return
+        sids.discard(sid)
+        if not sids:
+            del users[key]
+            if not users:
+                del self._rooms[room_id]
+            self._mark(room_id)
+
+    # -- reads --------------------------------------------------------------------
+    def online_count(self, room_id):
+        return len(self._rooms.get(room_id, ()))
+
+    def online_users(self, room_id):
+        """Ids of the identified users connected to `room_id`."""
+        with self._lock:
+            return sorted(k for k in self._rooms.get(room_id, ()) if isinstance(k, int))
+
+    # -- debounced broadcast ------------------------------------------------------
+    def _mark(self, room_id):
+        # caller holds the lock
+        self.changes += 1
+        self._dirty.add(room_id)
+        if not self._flush_pending:
+            self._flush_pending = True
+            socketio.start_background_task(self._flush_later)
+
+    def _flush_later(self):
+        socketio.sleep(self.debounce)
+        self.flush()
+
+    def flush(self):
+        """Emit one presence_update per room changed since the last flush."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._flush_pending = False
+            counts = {room_id: len(self._rooms.get(room_id, ())) for room_id in dirty}
+        for room_id, count in counts.items():
+            socketio.emit("presence_update", {"chatroom_id": room_id, "online_count": count},
+                          to=str(room_id))
+        self.updates += len(counts)
+
+    def clear(self):
+        with self._lock:
+            self._rooms.clear()
+            self._sessions.clear()
+            self._dirty.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rooms": len(self._rooms),
+                "sessions": len(self._sessions),
+                "online": sum(len(users) for users in self._rooms.values()),
+                "debounce_ms": self.debounce * 1000.0,
+                "pending_rooms": len(self._dirty),
+                "changes": self.changes,
+                "updates": self.updates,
+            }
+
+
+presence = Presence()
@@ -0,0 +1,119 @@
+"""
+Indexed user search for autocomplete.
+
+PostgreSQL: GIN trigram indexes (pg_trgm) on username and email let the
+planner answer `ILIKE '%q%'` from the index instead of scanning users.
+
+SQLite: an external-content FTS5 table using the trigram tokenizer,
+kept in sync with `users` by triggers. Queries of three or more
+characters are resolved through it; shorter ones (below trigram length)
+fall back to the plain scan.
+
+Either way results are ranked exact match, then prefix, then substring.
+"""
+from sqlalchemy import DDL, case, column, event, func, inspect, text
+
+from app.models.user import User
+
+SEARCH_TABLE = "users_search"
+MIN_TRIGRAM_LEN = 3
+
+_users = User.__table__
+
+# -- PostgreSQL ----------------------------------------------------------------
+_PG_EXTENSION = "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+_PG_INDEXES = tuple(
+    f"CREATE INDEX IF NOT EXISTS ix_users_{col}_trgm ON users USING gin ({col} gin_trgm_ops)"
+    for col in ("username", "email")
+)
+event.listen(_users, "before_create", DDL(_PG_EXTENSION).execute_if(dialect="postgresql"))
+for _stmt in _PG_INDEXES:
+    event.listen(_users, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+
+# -- SQLite --------------------------------------------------------------------
+_SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "username, email, content='users', content_rowid='id', tokenize='trigram')",
+
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON users BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, username, email) "
+    "VALUES (new.id, new.username, new.email); END",
+
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON users BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, username, email) "
+    "VALUES ('delete', old.id, old.username, old.email); END",
+
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE OF username, email "
+    f"ON users BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, username, email) "
+    "VALUES ('delete', old.id, old.username, old.email); "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, username, email) "
+    "VALUES (new.id, new.username, new.email); END",
+
+    # index any rows that predate the triggers
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')",
+)
+for _stmt in _SQLITE_DDL:
+    event.listen(_users, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+event.listen(_users, "before_drop",
+             DDL(f"DROP TABLE IF EXISTS {SEARCH_TABLE}").execute_if(dialect="sqlite"))
+
+
+def ensure_search_index(connection):
+    """
+    Create the search indexes on a database made before they existed
+    (every statement is a no-op once they are there).
+    """
+    if connection.dialect.name == "postgresql":
+        for stmt in (_PG_EXTENSION, *_PG_INDEXES):
+            connection.execute(text(stmt))
+        return
+    if connection.dialect.name != "sqlite":
+        return
+    if SEARCH_TABLE in inspect(connection).get_table_names():
+        return
+    for stmt in _SQLITE_DDL:
+        connection.execute(text(stmt))
+
+
+def _like_escape(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fts_phrase(value):
+    return '"' + value.replace('"', '""') + '"'
+
+
+def search_users(session, query, limit=10):
+    """Active users whose username or email contains `query`, best first."""
+    q = query.strip().lower()
+    escaped = _like_escape(q)
+    username, email = func.lower(User.username), func.lower(User.email)
+
+    rank = case(
+        ((username == q) | (email == q), 0),
+        (username.like(f"{escaped}%", escape="\\")
+         | email.like(f"{escaped}%", escape="\\"), 1),
+        else_=2,
+    )
+
+    stmt = session.query(User).filter(User.is_active.is_(True))
+    if session.get_bind().dialect.name == "sqlite" and len(q) >= MIN_TRIGRAM_LEN:
+        matches = (
+            text(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :phrase")
+            .bindparams(phrase=_fts_phrase(q))
+            .columns(column("rowid"))
+        )
+        stmt = stmt.filter(User.id.in_(matches))
+    else:
+        # PostgreSQL serves this from the trigram indexes
+        stmt = stmt.filter(
+            User.username.ilike(f"%{escaped}%", escape="\\")
+            | User.email.ilike(f"%{escaped}%", escape="\\")
+        )
+
+    return (
+        stmt.order_by(rank, func.length(User.username), User.username)
+        .limit(limit)
+        .all()
+    )
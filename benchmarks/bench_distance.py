@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Scalar vs vectorized Haversine.
+
+Compares a per-pair Python loop (what the discovery endpoints used to do)
+with app.utils.helpers.batch_distance at several candidate counts.
+
+    python benchmarks/bench_distance.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.utils.helpers import batch_distance  # noqa: E402
+
+
+def scalar_distance(lat1, lon1, lat2, lon2):
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat / 2) ** 2 +
+         math.cos(math.radians(lat1)) *
+         math.cos(math.radians(lat2)) *
+         math.sin(dlon / 2) ** 2)
+    return 6371.0 * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+
+
+def scalar_pass(lat, lon, lats, lons, radius):
+    hits = []
+    for i in range(len(lats)):
+        d = scalar_distance(lat, lon, lats[i], lons[i])
+        if d <= radius:
+            hits.append((d, i))
+    hits.sort()
+    return [i for _, i in hits]
+
+
+def best_of(fn, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--radius", type=float, default=50.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    origin = (40.7291, -73.9965)
+
+    print(f"{'points':>10} {'scalar ms':>12} {'batch ms':>10} {'speedup':>8}")
+    for n in args.sizes:
+        # candidates scattered over roughly the north-eastern US
+        lats = rng.uniform(38.0, 44.0, n)
+        lons = rng.uniform(-80.0, -70.0, n)
+        lat_list, lon_list = lats.tolist(), lons.tolist()
+
+        expected = scalar_pass(*origin, lat_list, lon_list, args.radius)
+        got = batch_distance(*origin, lats, lons, args.radius).order.tolist()
+        assert expected == got, "batch result diverges from scalar loop"
+
+        scalar = best_of(lambda: scalar_pass(*origin, lat_list, lon_list, args.radius),
+                         args.repeat)
+        batch = best_of(lambda: batch_distance(*origin, lat_list, lon_list, args.radius),
+                        args.repeat)
+        print(f"{n:>10} {scalar * 1e3:>12.1f} {batch * 1e3:>10.1f} {scalar / batch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Serialization cost of typical payloads (a page of messages, a room list,
+an event list): Flask's stdlib provider vs app.utils.json_provider.
+
+    python benchmarks/bench_json.py [--rows 50 500 5000] [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask import Flask                                   # noqa: E402
+from flask.json.provider import DefaultJSONProvider       # noqa: E402
+
+from app.utils import json_provider                       # noqa: E402
+
+
+def message(i, now):
+    return {"id": i, "chatroom_id": 1, "user_id": i % 37, "content": f"message body {i} " * 4,
+            "message_type": "text", "media_url": None, "username": f"user{i % 37}",
+            "profile_picture": None, "created_at": now - timedelta(seconds=i)}
+
+
+def event(i, now):
+    return {"id": i, "title": f"Event {i}", "description": "Live music and food " * 3,
+            "business_id": i % 11, "business_name": f"biz{i % 11}",
+            "location": {"latitude": 40.7 + i * 1e-4, "longitude": -74.0, "address": "1 Main St"},
+            "event_date": now + timedelta(hours=i), "max_attendees": 100,
+            "category": "music", "is_public": True, "created_at": now}
+
+
+def stdlib_default(o):
+    # what the models did before: isoformat() up front
+    return o.isoformat() if isinstance(o, datetime) else DefaultJSONProvider.default(o)
+
+
+def timed(fn, payload, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(payload)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    stdlib.default = stdlib_default
+    fast = json_provider.FastJSONProvider(app)
+    encoder = "orjson" if json_provider.orjson else "stdlib fallback"
+    now = datetime.utcnow()
+
+    print(f"fast provider uses {encoder}")
+    print(f"{'payload':>16} {'stdlib ms':>10} {'fast ms':>10} {'speedup':>8}")
+    with app.app_context():
+        for rows in args.rows:
+            for name, make in (("messages", message), ("events", event)):
+                payload = {name: [make(i, now) for i in range(rows)]}
+                slow_ms = timed(lambda p: stdlib.response(p).get_data(), payload, args.repeat)
+                fast_ms = timed(lambda p: fast.response(p).get_data(), payload, args.repeat)
+                label = f"{rows} {name}"
+                print(f"{label:>16} {slow_ms:>10.3f} {fast_ms:>10.3f} {slow_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
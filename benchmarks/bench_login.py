@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Concurrent logins alongside chat traffic under eventlet.
+
+A "chat" green thread wakes every --tick-ms and records how late it was;
+meanwhile --logins green threads each verify a bcrypt password. Run once
+with bcrypt called inline (the old behaviour) and once through
+app.utils.passwords, which hands the work to eventlet's native tpool.
+
+    python benchmarks/bench_login.py [--logins 32] [--rounds 12] [--threads 4]
+"""
+import eventlet
+eventlet.monkey_patch()
+
+import argparse   # noqa: E402
+import os         # noqa: E402
+import statistics  # noqa: E402
+import sys        # noqa: E402
+import time       # noqa: E402
+
+import bcrypt     # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.utils import passwords  # noqa: E402
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(label, verify, args, hashed):
+    lags, done = [], eventlet.event.Event()
+    tick = args.tick_ms / 1000.0
+
+    def chat():
+        while not done.ready():
+            start = time.perf_counter()
+            eventlet.sleep(tick)
+            lags.append((time.perf_counter() - start - tick) * 1e3)
+
+    def login():
+        assert verify("correct horse", hashed)
+
+    ticker = eventlet.spawn(chat)
+    eventlet.sleep(tick * 5)
+    start = time.perf_counter()
+    pool = eventlet.GreenPool(args.logins)
+    for _ in range(args.logins):
+        pool.spawn(login)
+    pool.waitall()
+    elapsed = time.perf_counter() - start
+    done.send()
+    ticker.wait()
+
+    print(f"{label:>8} {args.logins / elapsed:>9.1f} "
+          f"{statistics.median(lags):>9.1f} {percentile(lags, 99):>9.1f} {max(lags):>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--tick-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    passwords.DEFAULT_THREADS = args.threads
+    hashed = bcrypt.hashpw(b"correct horse", bcrypt.gensalt(args.rounds)).decode()
+
+    def inline(raw, h):
+        return bcrypt.checkpw(raw.encode(), h.encode())
+
+    print(f"{args.logins} logins, cost {args.rounds}, {args.threads} hashing threads")
+    print(f"{'mode':>8} {'logins/s':>9} {'lag p50':>9} {'lag p99':>9} {'lag max':>9}  (chat tick lag, ms)")
+    run("inline", inline, args, hashed)
+    run("tpool", passwords.verify_password, args, hashed)
+
+
+if __name__ == "__main__":
+    main()
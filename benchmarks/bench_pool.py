@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Pool sizing under eventlet: --clients green threads each check out a
+connection, run a query and hold it for --hold-ms (standing in for a
+slow query or a transaction that yields). Prints throughput and the
+checkout-wait figures app.utils.pool_metrics reports, per pool size.
+
+    python benchmarks/bench_pool.py [--clients 200] [--sizes 5 20 50] [--hold-ms 20]
+"""
+import eventlet
+eventlet.monkey_patch()
+
+import argparse   # noqa: E402
+import os         # noqa: E402
+import sys        # noqa: E402
+import tempfile   # noqa: E402
+import time       # noqa: E402
+
+from sqlalchemy import create_engine, exc, text   # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.utils.pool_metrics import InstrumentedQueuePool, pool_metrics, pool_stats  # noqa: E402
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="hubhive-bench-"), "bench.db")
+
+
+def run(size, args):
+    engine = create_engine(f"sqlite:///{DB_PATH}", poolclass=InstrumentedQueuePool,
+                           pool_size=size, max_overflow=args.overflow,
+                           pool_timeout=args.timeout)
+    pool_metrics.clear()
+    hold = args.hold_ms / 1000.0
+
+    def client():
+        for _ in range(args.requests):
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1")).scalar()
+                    eventlet.sleep(hold)
+            except exc.TimeoutError:
+                pass
+
+    start = time.perf_counter()
+    pool = eventlet.GreenPool(args.clients)
+    for _ in range(args.clients):
+        pool.spawn(client)
+    pool.waitall()
+    elapsed = time.perf_counter() - start
+
+    stats = pool_stats(engine)
+    engine.dispose()
+    return stats, stats["checkouts"] / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=10, help="per client")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--overflow", type=int, default=0)
+    parser.add_argument("--hold-ms", type=float, default=20)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.requests}, hold {args.hold_ms} ms, overflow {args.overflow}")
+    print(f"{'pool':>5} {'checkouts/s':>12} {'wait p50':>9} {'wait p95':>9} "
+          f"{'wait max':>9} {'saturated':>10} {'timeouts':>9}")
+    for size in args.sizes:
+        stats, rate = run(size, args)
+        wait = stats["checkout_wait"]
+        print(f"{size:>5} {rate:>12.0f} {wait['p50_ms']:>9.1f} {wait['p95_ms']:>9.1f} "
+              f"{wait['max_ms']:>9.1f} {stats['saturated_checkouts']:>10} {stats['timeouts']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+User search latency: the old `ILIKE '%q%'` scan vs app.utils.search
+(FTS5 trigram on SQLite) across user-table sizes, on an on-disk file.
+
+    python benchmarks/bench_user_search.py [--sizes 1000 10000 100000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="hubhive-bench-"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from app import create_app                   # noqa: E402
+from app.extensions import db                # noqa: E402
+from app.models.user import User             # noqa: E402
+from app.utils.search import search_users    # noqa: E402
+
+
+def random_name(rng):
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12)))
+
+
+def seed(total, start, rng):
+    rows = []
+    for i in range(start, total):
+        name = f"{random_name(rng)}{i}"
+        rows.append(dict(email=f"{name}@example.com", username=name,
+                         password="x", user_type="regular", is_active=True))
+    if rows:
+        db.session.execute(User.__table__.insert(), rows)
+        db.session.commit()
+
+
+def scan(q, limit=10):
+    return (
+        db.session.query(User)
+        .filter(User.username.ilike(f"%{q}%") | User.email.ilike(f"%{q}%"))
+        .filter(User.is_active.is_(True))
+        .limit(limit)
+        .all()
+    )
+
+
+def indexed(q, limit=10):
+    return search_users(db.session, q, limit)
+
+
+def measure(fn, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        print(f"{DB_PATH}")
+        print(f"{'users':>8} {'mode':>8} {'p50 ms':>8} {'p95 ms':>8}")
+
+        seeded = 0
+        for size in sorted(args.sizes):
+            seed(size, seeded, rng)
+            seeded = size
+            # autocomplete-style fragments; many miss entirely (worst case for a scan)
+            queries = [random_name(rng)[:rng.randint(3, 5)] for _ in range(args.queries)]
+            for label, fn in (("scan", scan), ("indexed", indexed)):
+                p50, p95 = measure(fn, queries)
+                print(f"{size:>8} {label:>8} {p50:>8.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
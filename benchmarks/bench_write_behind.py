@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Chat message write throughput: one commit per message vs write-behind
+group commits at several batch sizes, against an on-disk SQLite file.
+
+    python benchmarks/bench_write_behind.py [--messages 5000] [--batch-sizes 1 10 50 200 1000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="hubhive-bench-"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from app import create_app                            # noqa: E402
+from app.extensions import db                         # noqa: E402
+from app.models.chatroom import Chatroom              # noqa: E402
+from app.models.message import Message                # noqa: E402
+from app.models.user import User                      # noqa: E402
+from app.utils.message_writer import message_writer   # noqa: E402
+
+
+def fields(i):
+    return dict(chatroom_id=1, user_id=1, content=f"message {i}",
+                message_type="text", created_at=datetime.utcnow())
+
+
+def per_message_commit(n):
+    for i in range(n):
+        db.session.add(Message(**fields(i)))
+        db.session.commit()
+
+
+def write_behind(n, batch_size):
+    message_writer.enabled = True
+    message_writer.batch_size = batch_size
+    for i in range(n):
+        message_writer.submit(fields(i))
+    message_writer.stop()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+",
+                        default=[1, 10, 50, 200, 1000])
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email="bench@hubhive.com", username="bench", password="x")
+        db.session.add(user)
+        db.session.add(Chatroom(name="bench", created_by=1))
+        db.session.commit()
+
+        print(f"{args.messages} messages, {DB_PATH}")
+        print(f"{'mode':>22} {'msg/s':>10} {'commits':>8}")
+
+        elapsed = timed(per_message_commit, args.messages)
+        print(f"{'commit per message':>22} {args.messages / elapsed:>10.0f} {args.messages:>8}")
+
+        for size in args.batch_sizes:
+            before = message_writer.batches
+            elapsed = timed(write_behind, args.messages, size)
+            commits = message_writer.batches - before
+            print(f"{f'write-behind x{size}':>22} {args.messages / elapsed:>10.0f} {commits:>8}")
+
+
+if __name__ == "__main__":
+    main()
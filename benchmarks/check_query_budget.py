@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Query-count budgets for the main endpoints, checked with
+app.utils.instrumentation.assert_max_queries against a small seeded
+SQLite file. Exits non-zero if any endpoint goes over its budget
+(typically a new N+1).
+
+    python benchmarks/check_query_budget.py [--rows 25]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="hubhive-bench-"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("HTTP_CACHE_ENABLED", "False")
+
+from app import create_app                                  # noqa: E402
+from app.extensions import db                               # noqa: E402
+from app.models.message import Message                      # noqa: E402
+from app.utils.instrumentation import assert_max_queries    # noqa: E402
+
+# (method, url, json, budget); budgets must not grow with --rows
+BUDGETS = [
+    ("GET",  "/api/auth/profile",                None, 1),
+    ("GET",  "/api/chat/rooms",                  None, 2),
+    ("GET",  "/api/chat/rooms?lat=40&lng=-74",   None, 2),
+    ("GET",  "/api/chat/rooms/1",                None, 4),
+    ("GET",  "/api/chat/rooms/1/messages",       None, 3),
+    ("GET",  "/api/events/",                     None, 2),
+    ("GET",  "/api/events/1",                    None, 2),
+    ("GET",  "/api/businesses/my-chatrooms",     None, 2),
+    ("GET",  "/api/businesses/my-events",        None, 2),
+    ("GET",  "/api/users/search?q=user",         None, 2),
+]
+
+
+def seed(client, rows):
+    tokens = []
+    for i in range(rows):
+        r = client.post("/api/auth/register", json={
+            "email": f"user{i}@hubhive.com", "password": "password123",
+            "username": f"user{i}", "user_type": "business",
+        })
+        tokens.append({"Authorization": f"Bearer {r.json['access_token']}"})
+
+    when = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    location = {"latitude": 40.0, "longitude": -74.0}
+    for auth in tokens:
+        client.post("/api/chat/rooms", json={"name": "room", "location": location}, headers=auth)
+        client.post("/api/events/", json={"title": "event", "event_date": when,
+                                          "location": location}, headers=auth)
+        client.post("/api/chat/rooms/1/join", headers=auth)
+    # one message per member, so the page has many distinct authors
+    db.session.add_all([Message(chatroom_id=1, user_id=i + 1, content="hi")
+                        for i in range(rows)])
+    db.session.commit()
+    return tokens[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=25)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        auth = seed(client, args.rows)
+
+    failed = 0
+    for method, url, body, budget in BUDGETS:
+        try:
+            with assert_max_queries(budget) as stats:
+                r = client.open(url, method=method, json=body, headers=auth)
+                r.get_data()                    # drain streamed bodies
+            print(f"ok    {stats.count:>3}/{budget:<3} {method} {url} -> {r.status_code}")
+        except AssertionError as exc:
+            failed += 1
+            print(f"FAIL  {method} {url}\n{exc}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Load-test suite for the REST and Socket.IO hot paths.
+
+Seeds a fresh database at each scale, drives create_app() through the
+Flask test client and the Socket.IO test client, and reports p50/p95/p99
+latency and throughput per scenario. Results are written to
+benchmarks/results/suite-<timestamp>.json; `--compare` diffs against an
+earlier run and exits non-zero on a p95 regression.
+
+    python benchmarks/suite.py [--scales 1000 10000] [--iterations 200]
+    python benchmarks/suite.py --database-url postgresql://localhost/hubhive_bench
+    python benchmarks/suite.py --compare benchmarks/results/suite-<earlier>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000],
+                        help="number of users; rooms, events and messages scale with it")
+    parser.add_argument("--iterations", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--login-iterations", type=int, default=20, help="bcrypt is slow on purpose")
+    parser.add_argument("--listeners", type=int, default=50, help="sockets in the fan-out room")
+    parser.add_argument("--database-url", help="default: a temporary SQLite file")
+    parser.add_argument("--http-cache", action="store_true", help="leave the response cache on")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    parser.add_argument("--threshold", type=float, default=0.20, help="p95 regression ratio")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+ARGS = parse_args()
+DB_URL = ARGS.database_url or "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="hubhive-bench-"), "bench.db")
+os.environ["DATABASE_URL"] = DB_URL
+os.environ["HTTP_CACHE_ENABLED"] = str(ARGS.http_cache)
+os.environ.setdefault("SQL_INSTRUMENTATION", "False")
+
+from app import create_app                             # noqa: E402
+from app.extensions import db, socketio                # noqa: E402
+from app.models.chatroom import Chatroom, chatroom_participants  # noqa: E402
+from app.models.event import Event                     # noqa: E402
+from app.models.message import Message                 # noqa: E402
+from app.models.user import User                       # noqa: E402
+from app.utils.identity import issue_access_token      # noqa: E402
+from app.utils.passwords import hash_password          # noqa: E402
+
+CENTER = (40.7128, -74.0060)
+PASSWORD = "benchmark-password"
+
+
+# ---------------------------------------------------------------------------
+# Seeding
+# ---------------------------------------------------------------------------
+def seed(users, rng):
+    """Bulk-load one scale: users, rooms (5 members each), events, messages."""
+    db.drop_all()
+    db.create_all()
+    rooms, events, messages = max(users // 5, 1), users, users * 10
+    hashed = hash_password(PASSWORD)           # one bcrypt for every account
+    now = datetime.utcnow()
+
+    def near():
+        return {"latitude": CENTER[0] + rng.uniform(-0.5, 0.5),
+                "longitude": CENTER[1] + rng.uniform(-0.5, 0.5)}
+
+    def rows(n, make, chunk=5000):
+        for start in range(0, n, chunk):
+            yield [make(i) for i in range(start, min(n, start + chunk))]
+
+    for batch in rows(users, lambda i: dict(
+            email=f"user{i}@bench.hubhive.com", username=f"user{i}",
+            password=hashed, user_type="business" if i % 10 == 0 else "regular",
+            is_active=True, token_version=0, location={})):
+        db.session.execute(User.__table__.insert(), batch)
+
+    def room(i):
+        loc = near()
+        return dict(name=f"room {i}", description="benchmark room", business_id=(i * 10) % users + 1,
+                    created_by=(i * 10) % users + 1, location=loc, latitude=loc["latitude"],
+                    longitude=loc["longitude"], is_private=False, max_participants=100,
+                    participant_count=5)
+    for batch in rows(rooms, room):
+        db.session.execute(Chatroom.__table__.insert(), batch)
+
+    for batch in rows(rooms * 5, lambda i: dict(chatroom_id=i // 5 + 1,
+                                                user_id=(i // 5 * 7 + i % 5) % users + 1)):
+        db.session.execute(chatroom_participants.insert(), batch)
+
+    def event(i):
+        loc = near()
+        return dict(title=f"event {i}", description="benchmark event", business_id=(i * 10) % users + 1,
+                    location=loc, latitude=loc["latitude"], longitude=loc["longitude"],
+                    event_date=now + timedelta(hours=rng.randint(-30 * 24, 60 * 24)),
+                    category=rng.choice(["music", "food", "sports", "art"]), is_public=True)
+    for batch in rows(events, event):
+        db.session.execute(Event.__table__.insert(), batch)
+
+    for batch in rows(messages, lambda i: dict(
+            chatroom_id=i % rooms + 1, user_id=(i % rooms * 7 + i % 5) % users + 1,
+            content=f"message {i}", message_type="text",
+            created_at=now - timedelta(seconds=messages - i))):
+        db.session.execute(Message.__table__.insert(), batch)
+
+    db.session.commit()
+    return {"users": users, "rooms": rooms, "events": events, "messages": messages}
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure(fn, iterations, warmup=5):
+    for i in range(min(warmup, iterations)):
+        fn(i)
+    samples = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - start
+    samples.sort()
+    return {
+        "n": iterations,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "throughput_rps": round(iterations / elapsed, 1),
+    }
+
+
+def check(response, status=200):
+    if response.status_code != status:
+        raise RuntimeError(f"{response.request.path}: {response.status_code} {response.get_data()[:200]!r}")
+    response.get_data()             # drain streamed bodies
+    return response
+
+
+def scenarios(app, counts, rng):
+    client = app.test_client()
+    with app.app_context():
+        auth = {"Authorization": f"Bearer {issue_access_token(db.session.get(User, 1))}"}
+        hot_room = 1
+        members = [uid for (uid,) in db.session.query(chatroom_participants.c.user_id)
+                   .filter(chatroom_participants.c.chatroom_id == hot_room)]
+
+    def rooms_nearby(_):
+        lat, lng = CENTER[0] + rng.uniform(-0.3, 0.3), CENTER[1] + rng.uniform(-0.3, 0.3)
+        check(client.get("/api/chat/rooms", query_string={"lat": lat, "lng": lng, "max_distance": 5},
+                         headers=auth))
+
+    def events_upcoming(i):
+        params = [{"category": "music"}, {"category": "food"}, {}][i % 3]
+        check(client.get("/api/events/", query_string=params))
+
+    def history(_):
+        room = rng.randint(1, counts["rooms"])
+        check(client.get(f"/api/chat/rooms/{room}/messages", headers=auth))
+
+    def login(i):
+        user = rng.randint(0, counts["users"] - 1)
+        check(client.post("/api/auth/login",
+                          json={"email": f"user{user}@bench.hubhive.com", "password": PASSWORD}))
+
+    def search(_):
+        check(client.get("/api/users/search", query_string={"q": f"user{rng.randint(0, 999)}"},
+                         headers=auth))
+
+    listeners = [socketio.test_client(app) for _ in range(ARGS.listeners)]
+    for sock in listeners:
+        sock.emit("join_room", {"chatroom_id": hot_room})
+        sock.get_received()
+    sender = listeners[0]
+
+    def send_message(i):
+        sender.emit("send_message", {"chatroom_id": hot_room, "user_id": members[i % len(members)],
+                                     "content": f"bench {i}"})
+        for sock in listeners:
+            if not any(p["name"] == "new_message" for p in sock.get_received()):
+                raise RuntimeError("fan-out did not reach every listener")
+
+    results = {
+        "rooms_nearby": measure(rooms_nearby, ARGS.iterations),
+        "events_upcoming": measure(events_upcoming, ARGS.iterations),
+        "message_history": measure(history, ARGS.iterations),
+        "login": measure(login, ARGS.login_iterations, warmup=1),
+        "user_search": measure(search, ARGS.iterations),
+        "send_message_fanout": measure(send_message, ARGS.iterations),
+    }
+    for sock in listeners:
+        sock.disconnect()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current, previous_path, threshold):
+    with open(previous_path) as fh:
+        previous = json.load(fh)["results"]
+    regressions = 0
+    print(f"\nvs {previous_path} (p95, regression > {threshold:.0%})")
+    for scale, scenarios_ in current.items():
+        for name, now in scenarios_.items():
+            before = previous.get(scale, {}).get(name)
+            if not before:
+                continue
+            ratio = now["p95_ms"] / before["p95_ms"] if before["p95_ms"] else 1.0
+            flag = "REGRESSION" if ratio > 1 + threshold else ""
+            regressions += bool(flag)
+            print(f"{scale:>8} {name:>20} {before['p95_ms']:>9.2f} -> {now['p95_ms']:>9.2f} ms "
+                  f"{ratio - 1:>+7.1%} {flag}")
+    return regressions
+
+
+def main():
+    rng = random.Random(ARGS.seed)
+    app = create_app()
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "database": DB_URL.split("://")[0],
+            "python": platform.python_version(),
+            "iterations": ARGS.iterations,
+            "listeners": ARGS.listeners,
+            "http_cache": ARGS.http_cache,
+        },
+        "scales": {},
+        "results": {},
+    }
+
+    print(f"{'users':>8} {'scenario':>20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    for users in ARGS.scales:
+        with app.app_context():
+            counts = seed(users, rng)
+        report["scales"][str(users)] = counts
+        results = scenarios(app, counts, rng)
+        report["results"][str(users)] = results
+        for name, r in results.items():
+            print(f"{users:>8} {name:>20} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+                  f"{r['p99_ms']:>9.2f} {r['throughput_rps']:>9.1f}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"suite-{datetime.utcnow():%Y%m%d-%H%M%S}.json")
+    with open(path, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nsaved {path}")
+
+    if ARGS.compare and compare(report["results"], ARGS.compare, ARGS.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,90 @@
 import os
+import signal
+import sys
+import uuid
+
+# eventlet has to patch the stdlib before anything else (Flask, SQLAlchemy,
+# psycopg2's socket use, ...) is imported, so this reads the environment
+# directly rather than going through app.config.
+ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE", "eventlet")
+if ASYNC_MODE == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+
 from app import create_app
-from app.extensions import socketio
+from app.extensions import db, socketio
 
 app = create_app()
 
+
+def _fork_workers(count):
+    """
+    Fork `count - 1` children that serve the already-bound listener.
+    Returns the child pids in the parent and None in a child.
+    """
+    children = []
+    for _ in range(count - 1):
+        pid = os.fork()
+        if pid == 0:
+            # fresh pub/sub identity and no pooled connections from the parent
+            manager = socketio.server.manager
+            if hasattr(manager, "host_id"):
+                manager.host_id = uuid.uuid4().hex
+            with app.app_context():
+                db.engine.dispose(close=False)
+            return None
+        children.append(pid)
+    return children
+
+
+def _install_shutdown(children):
+    # SystemExit runs atexit hooks, which drain the chat write-behind queue
+    def _stop(signum, frame):
+        for pid in children or ():
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+
+def serve_production():
+    cfg = app.config
+    if ASYNC_MODE != "eventlet":
+        # the only other server Flask-SocketIO runs itself is Werkzeug's
+        # development server, which is not fit to face real traffic
+        sys.exit(f"SERVER_MODE=production requires SOCKETIO_ASYNC_MODE=eventlet "
+                 f"(got {ASYNC_MODE!r}); use threading only for local development")
+    workers = cfg["SERVER_WORKERS"]
+    if workers > 1 and not cfg["SOCKETIO_MESSAGE_QUEUE"]:
+        sys.exit("SERVER_WORKERS > 1 requires SOCKETIO_MESSAGE_QUEUE")
+
+    import eventlet.wsgi
+
+    listener = eventlet.listen((cfg["SERVER_HOST"], cfg["SERVER_PORT"]),
+                               backlog=cfg["SERVER_BACKLOG"])
+    children = _fork_workers(workers) if workers > 1 else []
+    _install_shutdown(children)
+
+    # workers share one listening socket with no sticky routing, so with
+    # several of them clients must connect with the websocket transport
+    eventlet.wsgi.server(listener, app,
+                         max_size=cfg["SERVER_MAX_CONNECTIONS"],
+                         log_output=False)
+
+
 if __name__ == "__main__":
-    debug = os.getenv("FLASK_DEBUG", "True").lower() == "true"
-    socketio.run(
-        app, 
-        host="0.0.0.0", 
-        port=5000, 
-        debug=debug, 
-        use_reloader=debug
-    )
+    if app.config["SERVER_MODE"] == "production":
+        serve_production()
+    else:
+        debug = os.getenv("FLASK_DEBUG", "True").lower() == "true"
+        socketio.run(
+            app, 
+            host=app.config["SERVER_HOST"], 
+            port=app.config["SERVER_PORT"], 
+            debug=debug, 
+            use_reloader=debug
+        )
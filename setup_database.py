@@ -3,9 +3,15 @@
 Database setup script for HubHive backend.
 Run this script to initialize the database with required tables and sample data.
 """
+import argparse
+import itertools
 import os
+import random
 import sys
-from sqlalchemy import create_engine, text
+import time
+from datetime import datetime, timedelta
+from flask_migrate import stamp, upgrade
+from sqlalchemy import create_engine, inspect, text
 
 # Add the app directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
@@ -13,8 +19,11 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 from app import create_app
 from app.extensions import db
 from app.models.user import User
-from app.models.chatroom import Chatroom
+from app.models.chatroom import Chatroom, chatroom_participants
 from app.models.event import Event
+from app.models.message import Message
+from app.utils.passwords import hash_password
+from app.utils.search import ensure_search_index
 import bcrypt
 
 def setup_database():
@@ -23,9 +32,17 @@ def setup_database():
     
     with app.app_context():
         try:
-            # Create all tables
-            print("Creating database tables...")
-            db.create_all()
+            if "users" in inspect(db.engine).get_table_names():
+                # existing database: bring its schema forward
+                print("Migrating database schema...")
+                upgrade()
+            else:
+                # Create all tables, then record them as up to date
+                print("Creating database tables...")
+                db.create_all()
+                stamp()
+            with db.engine.begin() as conn:
+                ensure_search_index(conn)
             print("Tables created successfully")
             
             # Create sample admin user if doesn't exist
@@ -78,12 +95,11 @@ def setup_database():
                 db.session.commit()
                 
                 # Add business as participant
-                chatroom.participants.append(business)
+                Chatroom.add_participant(db.session, chatroom.id, business.id)
                 db.session.commit()
                 print("Sample chatroom created")
                 
                 # Create sample event
-                from datetime import datetime, timedelta
                 event_date = datetime.utcnow() + timedelta(days=7)
                 
                 event = Event(
@@ -110,5 +126,253 @@ def setup_database():
             db.session.rollback()
             raise
 
-if __name__ == "__main__":
+# ---------------------------------------------------------------------------
+# Synthetic load data  (python setup_database.py --scale medium)
+# ---------------------------------------------------------------------------
+SCALES = {
+    #           users     rooms   events    messages
+    "small":  (10_000,    2_000,  10_000,    200_000),
+    "medium": (100_000,  20_000,  50_000,  2_000_000),
+    "large":  (500_000, 100_000, 200_000, 10_000_000),
+}
+
+# (name, latitude, longitude, weight) - users, rooms and events cluster here
+METROS = [
+    ("New York",      40.7128,  -74.0060, 20),
+    ("Los Angeles",   34.0522, -118.2437, 12),
+    ("Chicago",       41.8781,  -87.6298,  8),
+    ("Houston",       29.7604,  -95.3698,  6),
+    ("San Francisco", 37.7749, -122.4194,  6),
+    ("Boston",        42.3601,  -71.0589,  5),
+    ("Seattle",       47.6062, -122.3321,  4),
+    ("Miami",         25.7617,  -80.1918,  4),
+    ("London",        51.5074,   -0.1278, 10),
+    ("Berlin",        52.5200,   13.4050,  5),
+    ("Tokyo",         35.6762,  139.6503,  8),
+    ("Sydney",       -33.8688,  151.2093,  4),
+    ("Auckland",     -36.8485,  174.7633,  2),   # near the antimeridian
+    ("Sao Paulo",    -23.5505,  -46.6333,  6),
+]
+CATEGORIES = ["music", "food", "sports", "art", "tech", "nightlife", "outdoors", "family"]
+SYNTHETIC_PASSWORD = "password123"
+
+
+def synthetic_email(user_id):
+    """Login of the synthetic user with this id."""
+    return f"user{user_id}@synthetic.hubhive.com"
+
+
+class _Geo:
+    """Points scattered around weighted metro centres (~10 km spread)."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.cum_weights = list(itertools.accumulate(m[3] for m in METROS))
+
+    def metro(self):
+        return self.rng.choices(range(len(METROS)), cum_weights=self.cum_weights)[0]
+
+    def point(self, metro):
+        name, lat, lng, _ = METROS[metro]
+        lat = min(max(self.rng.gauss(lat, 0.09), -90.0), 90.0)
+        lng = (self.rng.gauss(lng, 0.12) + 180.0) % 360.0 - 180.0
+        return {"latitude": round(lat, 6), "longitude": round(lng, 6), "address": name}
+
+
+def _copy_rows(conn, table, columns, rows):
+    """PostgreSQL: stream one batch through COPY ... FROM STDIN."""
+    import csv
+    import io
+    import json
+
+    def cell(value):
+        if value is None:
+            return r"\N"
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([cell(row[c]) for c in columns])
+    buf.seek(0)
+    cursor = conn.connection.driver_connection.cursor()
+    cursor.copy_expert(
+        f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf
+    )
+
+
+def _bulk_insert(conn, table, rows):
+    """One batch: COPY on PostgreSQL, executemany everywhere else."""
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql":
+        _copy_rows(conn, table, list(rows[0]), rows)
+    else:
+        conn.execute(table.insert(), rows)
+
+
+def _next_id(conn, table):
+    return (conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {table.name}")).scalar() or 0) + 1
+
+
+def _load(conn, table, total, make, batch_size):
+    """Insert `total` rows built by make(i) in batches; prints progress."""
+    start = time.perf_counter()
+    for first in range(0, total, batch_size):
+        _bulk_insert(conn, table, [make(i) for i in range(first, min(total, first + batch_size))])
+        done = min(total, first + batch_size)
+        print(f"\r  {table.name:<22} {done:>11,} / {total:,}", end="", flush=True)
+    elapsed = time.perf_counter() - start
+    print(f"\r  {table.name:<22} {total:>11,} rows in {elapsed:6.1f}s "
+          f"({total / elapsed if elapsed else 0:,.0f}/s)")
+
+
+def seed_scale(users, rooms, events, messages, batch_size=10_000, seed=1):
+    """
+    Bulk-load a synthetic dataset on top of whatever is already there.
+    Every user gets the password SYNTHETIC_PASSWORD (hashed once); derived
+    columns (latitude/longitude, participant_count, token_version) are
+    filled directly since the ORM hooks that maintain them are bypassed.
+    Call inside an app context; returns the first synthetic user id.
+    """
+    rng = random.Random(seed)
+    geo = _Geo(rng)
+    hashed = hash_password(SYNTHETIC_PASSWORD)
+    now = datetime.utcnow()
+
+    users_t, rooms_t, events_t = User.__table__, Chatroom.__table__, Event.__table__
+    messages_t = Message.__table__
+
+    with db.engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        uid0, rid0, eid0, mid0 = (_next_id(conn, t) for t in (users_t, rooms_t, events_t, messages_t))
+
+        # -- users: one in ten is a business ---------------------------------
+        user_metro = [geo.metro() for _ in range(users)]
+        businesses = {}                     # metro -> [user ids]
+
+        def user(i):
+            business = i % 10 == 0
+            if business:
+                businesses.setdefault(user_metro[i], []).append(uid0 + i)
+            return dict(id=uid0 + i, email=synthetic_email(uid0 + i),
+                        username=f"user{uid0 + i}", password=hashed,
+                        user_type="business" if business else "regular",
+                        bio=None, profile_picture=None, location=geo.point(user_metro[i]),
+                        is_active=True, token_version=0, created_at=now, updated_at=None)
+
+        _load(conn, users_t, users, user, batch_size)
+        any_business = [b for ids in businesses.values() for b in ids] or [uid0]
+
+        # -- rooms, owned by a business in the same metro -------------------
+        room_metro = [geo.metro() for _ in range(rooms)]
+        capacity = [rng.choice((25, 50, 100, 250)) for _ in range(rooms)]
+        rooms_by_metro = {}
+        for r, metro in enumerate(room_metro):
+            rooms_by_metro.setdefault(metro, []).append(r)
+
+        # memberships: each user joins 0-6 rooms near them while seats last
+        members = [[] for _ in range(rooms)]
+        for i in range(users):
+            nearby = rooms_by_metro.get(user_metro[i])
+            if not nearby:
+                continue
+            for r in rng.sample(nearby, min(len(nearby), rng.randint(0, 6))):
+                if len(members[r]) < capacity[r]:
+                    members[r].append(uid0 + i)
+
+        def room(r):
+            loc = geo.point(room_metro[r])
+            owner = rng.choice(businesses.get(room_metro[r], any_business))
+            return dict(id=rid0 + r, name=f"{loc['address']} room {r}",
+                        description="Synthetic chatroom", business_id=owner,
+                        location=loc, latitude=loc["latitude"], longitude=loc["longitude"],
+                        is_private=r % 20 == 0, max_participants=capacity[r],
+                        participant_count=len(members[r]), created_by=owner, created_at=now)
+
+        _load(conn, rooms_t, rooms, room, batch_size)
+
+        memberships = [(rid0 + r, uid) for r in range(rooms) for uid in members[r]]
+        _load(conn, chatroom_participants, len(memberships),
+              lambda k: dict(chatroom_id=memberships[k][0], user_id=memberships[k][1]), batch_size)
+
+        # -- events: past 60 days to 120 days ahead ---------------------------
+        def event(e):
+            metro = geo.metro()
+            loc = geo.point(metro)
+            return dict(id=eid0 + e, title=f"{rng.choice(CATEGORIES).title()} night #{e}",
+                        description="Synthetic event",
+                        business_id=rng.choice(businesses.get(metro, any_business)),
+                        location=loc, latitude=loc["latitude"], longitude=loc["longitude"],
+                        event_date=now + timedelta(minutes=rng.randint(-60 * 24 * 60, 120 * 24 * 60)),
+                        max_attendees=rng.choice((None, 20, 50, 200)),
+                        category=rng.choice(CATEGORIES), is_public=e % 10 != 0, created_at=now)
+
+        _load(conn, events_t, events, event, batch_size)
+
+        # -- messages: skewed towards busy rooms, ids in time order -----------
+        active = [r for r in range(rooms) if members[r]]
+        cum_weights = list(itertools.accumulate(len(members[r]) ** 1.5 for r in active))
+        span = timedelta(days=90).total_seconds()
+
+        def message(m):
+            r = rng.choices(active, cum_weights=cum_weights)[0] if active else 0
+            author = rng.choice(members[r]) if members[r] else uid0
+            return dict(id=mid0 + m, chatroom_id=rid0 + r, user_id=author,
+                        content=f"synthetic message {m}", message_type="text", media_url=None,
+                        created_at=now - timedelta(seconds=span * (1 - m / max(messages, 1))))
+
+        _load(conn, messages_t, messages if active else 0, message, batch_size)
+
+        if conn.dialect.name == "postgresql":
+            # explicit ids were COPYed in; move the sequences past them
+            for table in (users_t, rooms_t, events_t, messages_t):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+                ))
+    return uid0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create tables and sample data.")
+    parser.add_argument("--scale", choices=sorted(SCALES),
+                        help="also load a synthetic dataset of this size")
+    parser.add_argument("--users", type=int, help="override the preset's user count")
+    parser.add_argument("--rooms", type=int)
+    parser.add_argument("--events", type=int)
+    parser.add_argument("--messages", type=int)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
     setup_database()
+    if not args.scale:
+        return
+
+    users, rooms, events, messages = SCALES[args.scale]
+    users = args.users if args.users is not None else users
+    rooms = args.rooms if args.rooms is not None else rooms
+    events = args.events if args.events is not None else events
+    messages = args.messages if args.messages is not None else messages
+
+    print(f"\nLoading '{args.scale}' synthetic data: {users:,} users, {rooms:,} rooms, "
+          f"{events:,} events, {messages:,} messages")
+    start = time.perf_counter()
+    with create_app().app_context():
+        first = seed_scale(users, rooms, events, messages, batch_size=args.batch_size, seed=args.seed)
+    print(f"Synthetic data loaded in {time.perf_counter() - start:.1f}s")
+    if users:
+        print(f"  Users: {synthetic_email(first)} .. {synthetic_email(first + users - 1)} "
+              f"/ {SYNTHETIC_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: starts real app processes (deselect with -m 'not slow')")
@@ -0,0 +1,116 @@
+"""
+Multi-process Socket.IO fan-out.
+
+Starts several app workers on separate ports that share rooms through the
+unix-socket fan-out backend, connects one client to each worker, sends
+`send_message` through the first one and checks that `new_message`
+reaches the clients of every worker.
+
+    pytest tests/test_fanout.py
+"""
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+WORKERS = 3
+MESSAGES = 20
+
+
+def serve(port, env):
+    import eventlet
+    eventlet.monkey_patch()
+    os.environ.update(env)
+
+    from app import create_app
+    from app.extensions import socketio
+
+    app = create_app()
+    socketio.run(app, host="127.0.0.1", port=port, log_output=False)
+
+
+def seed(env):
+    os.environ.update(env)
+    from app import create_app
+    from app.extensions import db
+    from app.models.chatroom import Chatroom
+    from app.models.user import User
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(email="fanout@hubhive.com", username="fanout", password="x"))
+        db.session.add(Chatroom(name="fanout", created_by=1))
+        db.session.commit()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def connect(port, received, deadline):
+    import socketio
+
+    while True:
+        client = socketio.Client()
+        client.on("new_message", lambda data: received.add(data["message"]["content"]))
+        try:
+            client.connect(f"http://127.0.0.1:{port}", transports=["polling"], wait_timeout=10)
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+            continue
+        client.emit("join_room", {"chatroom_id": 1})
+        return client
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Ports of WORKERS app processes sharing one database and fan-out directory."""
+    env = {
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'fanout.db'}",
+        "SOCKETIO_MESSAGE_QUEUE": f"unix://{tmp_path / 'sio'}",
+        "SOCKETIO_ASYNC_MODE": "eventlet",
+    }
+    seeder = multiprocessing.Process(target=seed, args=(env,))
+    seeder.start()
+    seeder.join()
+    assert seeder.exitcode == 0
+
+    ports = [free_port() for _ in range(WORKERS)]
+    procs = [multiprocessing.Process(target=serve, args=(port, env), daemon=True) for port in ports]
+    for proc in procs:
+        proc.start()
+    yield ports
+    for proc in procs:
+        proc.terminate()
+        proc.join(5)
+
+
+@pytest.mark.slow
+def test_broadcast_reaches_every_worker(workers):
+    deadline = time.monotonic() + 20
+    inboxes = [set() for _ in workers]
+    clients = [connect(port, inbox, deadline) for port, inbox in zip(workers, inboxes)]
+    try:
+        time.sleep(0.5)     # let every join_room land
+        expected = {f"m{i}" for i in range(MESSAGES)}
+        for content in sorted(expected):
+            clients[0].emit("send_message", {"chatroom_id": 1, "user_id": 1, "content": content})
+            time.sleep(0.01)
+
+        wait_until = time.monotonic() + 10
+        while time.monotonic() < wait_until and not all(inbox >= expected for inbox in inboxes):
+            time.sleep(0.05)
+
+        for port, inbox in zip(workers, inboxes):
+            assert inbox >= expected, f"worker on port {port} missed {sorted(expected - inbox)}"
+    finally:
+        for client in clients:
+            threading.Thread(target=client.disconnect, daemon=True).start()